@@ -0,0 +1,89 @@
+# File Path: benchmarks/api_benchmark.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Concurrent load test for the analytics API.
+# Key Features:
+# - Keeps --concurrency requests in flight against a running server for
+#   --duration seconds, cycling through a mix of endpoints.
+# - Reports requests/s, latency percentiles and errors per endpoint and overall.
+# - Run it against two servers (e.g. before/after a change, or different
+#   --workers / API_DB_POOL_SIZE settings) to compare throughput.
+
+import time
+import asyncio
+import argparse
+import itertools
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/reports/top-products?limit=10",
+    "/api/channels/tikvahpharma/activity",
+    "/api/search/messages?query=paracetamol&limit=20",
+]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def client_loop(client, paths, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        path = next(paths)
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - start
+        if ok:
+            latencies.setdefault(path, []).append(elapsed)
+        else:
+            errors[path] = errors.get(path, 0) + 1
+
+async def run(base_url, paths, concurrency, duration):
+    latencies, errors = {}, {}
+    cycle = itertools.cycle(paths)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        # One request per path first, so connection setup is not measured
+        for path in paths:
+            await client.get(path)
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, cycle, deadline, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the analytics API.")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of a running API server")
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="Endpoint path to request (repeatable); defaults to a mix of all endpoints")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests kept in flight")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    paths = args.paths or DEFAULT_PATHS
+    latencies, errors, elapsed = asyncio.run(run(args.url, paths, args.concurrency, args.duration))
+
+    print(f"{args.url}, concurrency {args.concurrency}, {elapsed:.1f}s")
+    print(f"{'endpoint':<52} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    everything = []
+    for path in paths:
+        values = latencies.get(path, [])
+        everything.extend(values)
+        print(f"{path[:52]:<52} {len(values) / elapsed:>8.1f} {percentile(values, 50) * 1000:>8.1f} "
+              f"{percentile(values, 95) * 1000:>8.1f} {percentile(values, 99) * 1000:>8.1f} {errors.get(path, 0):>7}")
+    print(f"{'total':<52} {len(everything) / elapsed:>8.1f} {percentile(everything, 50) * 1000:>8.1f} "
+          f"{percentile(everything, 95) * 1000:>8.1f} {percentile(everything, 99) * 1000:>8.1f} "
+          f"{sum(errors.values()):>7}")
+
+if __name__ == "__main__":
+    main()
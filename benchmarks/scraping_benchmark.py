@@ -0,0 +1,130 @@
+# File Path: benchmarks/scraping_benchmark.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Benchmark the scraping and image download paths offline.
+# Key Features:
+# - Runs the real scrape_channel / download_images code against the
+#   ReplayTelegramClient (no credentials or network needed).
+# - Synthetic channels or a replay of the local data lake (--recorded).
+# - Reports messages/s, photos/s, peak Python memory and API requests.
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.scraping.replay_client import ReplayTelegramClient, synthetic_channels, recorded_channels
+from src.scraping.scrape_runner import run_with_shared_client
+from src.scraping.scrape_state import CursorStore
+from src.scraping.telegram_scraper import scrape_channel
+from src.scraping.image_downloader import ImageIndex, download_images
+
+def run_scenario(label, channels, client_kwargs, make_worker, concurrency):
+    """
+    Runs one scenario in a scratch working directory and returns its metrics.
+    """
+    client = ReplayTelegramClient(channels, **client_kwargs)
+    workdir = tempfile.mkdtemp(prefix="scrape-bench-")
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        worker = make_worker()
+        tracemalloc.start()
+        start = time.perf_counter()
+        asyncio.run(run_with_shared_client(list(channels), worker, concurrency=concurrency,
+                                           client_factory=lambda: client))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.chdir(previous_cwd)
+
+    return {
+        "scenario": label,
+        "seconds": elapsed,
+        "peak_mb": peak / 1024 / 1024,
+        "requests": client.requests,
+        "flood_waits": client.flood_waits,
+        "workdir": workdir,
+    }
+
+def messages_worker():
+    cursor_store = CursorStore()
+
+    async def worker(channel, client):
+        await scrape_channel(channel, full=True, cursor_store=cursor_store, client=client)
+    return worker
+
+def photos_worker(download_concurrency):
+    def make():
+        index = ImageIndex()
+
+        async def worker(channel, client):
+            await download_images(channel, client, index=index, full=True, concurrency=download_concurrency)
+        return worker
+    return make
+
+def single_pass_worker(download_concurrency):
+    def make():
+        cursor_store = CursorStore()
+        index = ImageIndex()
+
+        async def worker(channel, client):
+            await scrape_channel(channel, full=True, cursor_store=cursor_store, client=client,
+                                 image_index=index, download_concurrency=download_concurrency)
+        return worker
+    return make
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline scraper throughput benchmark.")
+    parser.add_argument("--channels", type=int, default=5, help="Synthetic channels")
+    parser.add_argument("--messages", type=int, default=2000, help="Messages per synthetic channel")
+    parser.add_argument("--photo-ratio", type=float, default=0.3, help="Share of messages carrying a photo")
+    parser.add_argument("--image-kb", type=int, default=50, help="Synthetic image size")
+    parser.add_argument("--recorded", action="store_true", help="Replay data/raw instead of synthetic data")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Latency added to every request")
+    parser.add_argument("--rps", type=float, default=None, help="Rate limit in requests/s (default: none)")
+    parser.add_argument("--flood-wait", action="store_true", help="Raise FloodWaitError instead of throttling")
+    parser.add_argument("--bandwidth-mbps", type=float, default=None, help="Download bandwidth in MB/s")
+    parser.add_argument("--concurrency", type=int, default=5, help="Channels scraped at the same time")
+    parser.add_argument("--download-concurrency", type=int, default=4, help="Photos downloaded at the same time")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.recorded:
+        channels = recorded_channels()
+    else:
+        channels = synthetic_channels(args.channels, args.messages, args.photo_ratio, args.image_kb * 1024)
+
+    total_messages = sum(len(specs) for specs in channels.values())
+    total_photos = sum(1 for specs in channels.values() for spec in specs if spec.get("photo"))
+    client_kwargs = {
+        "latency": args.latency_ms / 1000,
+        "requests_per_second": args.rps,
+        "raise_flood_wait": args.flood_wait,
+        "bandwidth_bytes_per_second": args.bandwidth_mbps * 1024 * 1024 if args.bandwidth_mbps else None,
+    }
+
+    scenarios = [
+        ("messages", messages_worker, total_messages, "msg/s"),
+        ("photos", photos_worker(args.download_concurrency), total_photos, "photo/s"),
+        ("single-pass", single_pass_worker(args.download_concurrency), total_messages, "msg/s"),
+    ]
+
+    print(f"{len(channels)} channels, {total_messages} messages, {total_photos} photos, "
+          f"latency={args.latency_ms}ms, rps={args.rps}, concurrency={args.concurrency}")
+    print(f"{'scenario':<12} {'items':>8} {'seconds':>9} {'rate':>14} {'peak MB':>9} {'requests':>9} {'floods':>7}")
+    for label, make_worker, items, unit in scenarios:
+        result = run_scenario(label, channels, client_kwargs, make_worker, args.concurrency)
+        rate = items / max(result["seconds"], 1e-9)
+        print(f"{label:<12} {items:>8} {result['seconds']:>9.2f} {rate:>8.1f} {unit:<5} "
+              f"{result['peak_mb']:>9.1f} {result['requests']:>9} {result['flood_waits']:>7}")
+
+if __name__ == "__main__":
+    main()
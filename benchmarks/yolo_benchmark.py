@@ -0,0 +1,97 @@
+# File Path: benchmarks/yolo_benchmark.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Compare YOLO inference backends and worker counts on CPU.
+# Key Features:
+# - Runs the real analyze_parallel path for every backend x worker count.
+# - Uses the local image folder, or synthetic images with --synthetic.
+# - Results go to an in-memory sink, so no database is needed.
+# - Reports wall time (model loads included), images/s, load time and detections.
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.yolo.backends import BACKENDS, prepare_weights
+from src.yolo.batch_loader import DEFAULT_BATCH_SIZE, DEFAULT_IMGSZ
+from src.yolo.parallel_inference import analyze_parallel
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+class CountingSink:
+    """Stands in for DetectionWriter and only counts what it is given."""
+
+    def __init__(self):
+        self.images = 0
+        self.detections = 0
+
+    def add_image(self, image, boxes, width, height):
+        self.images += 1
+        self.detections += len(boxes)
+
+def local_images(image_dir, limit=None):
+    images = []
+    for root, _, files in os.walk(image_dir):
+        for img_file in sorted(files):
+            if img_file.lower().endswith(IMAGE_EXTENSIONS):
+                images.append((os.path.basename(root), img_file, os.path.join(root, img_file)))
+    return images[:limit] if limit else images
+
+def synthetic_images(count, width=1280, height=960, seed=42):
+    """Writes `count` random JPEGs to a temp folder and returns them as image tuples."""
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    folder = tempfile.mkdtemp(prefix="yolo-bench-")
+    images = []
+    for i in range(1, count + 1):
+        channel = f"channel{i % 3}"
+        os.makedirs(os.path.join(folder, channel), exist_ok=True)
+        img_path = os.path.join(folder, channel, f"{i}.jpg")
+        cv2.imwrite(img_path, rng.integers(0, 255, (height, width, 3), dtype=np.uint8))
+        images.append((channel, f"{i}.jpg", img_path))
+    return images
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="CPU inference benchmark across backends and worker counts.")
+    parser.add_argument("--image-dir", default="data/raw/images", help="Folder with one sub-folder per channel")
+    parser.add_argument("--synthetic", type=int, default=0, help="Generate this many random images instead")
+    parser.add_argument("--limit", type=int, default=200, help="Images taken from --image-dir")
+    parser.add_argument("--weights", default="yolov8s.pt", help="YOLO weights file")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated backends")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Images per model call")
+    parser.add_argument("--imgsz", type=int, default=DEFAULT_IMGSZ, help="Model input size")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    images = synthetic_images(args.synthetic) if args.synthetic else local_images(args.image_dir, args.limit)
+    if not images:
+        print("No images found; use --synthetic N to generate some.")
+        return
+
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    print(f"{len(images)} images, batch size {args.batch_size}, imgsz {args.imgsz}, {os.cpu_count()} cores")
+    print(f"{'backend':<8} {'workers':>7} {'seconds':>9} {'img/s':>8} {'load s':>7} {'detections':>11} {'errors':>7}")
+
+    for backend in backends:
+        weights = prepare_weights(args.weights, backend, args.imgsz)
+        for workers in worker_counts:
+            sink, stats = CountingSink(), {}
+            start = time.perf_counter()
+            analyze_parallel(sink, images, weights, workers=workers,
+                             batch_size=args.batch_size, imgsz=args.imgsz, stats=stats, backend=backend)
+            elapsed = time.perf_counter() - start
+            load = max(stats.get("load_seconds") or [0.0])
+            print(f"{backend:<8} {workers:>7} {elapsed:>9.2f} {sink.images / max(elapsed, 1e-9):>8.1f} "
+                  f"{load:>7.1f} {sink.detections:>11} {stats.get('errors', 0):>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# File Path: src/api/cache.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Run-aware response cache for the analytics API.
+# Key Features:
+# - Responses are keyed on endpoint + query parameters and stored in a
+#   size-bounded LRU with a TTL (in-process), or in Redis when
+#   API_CACHE_REDIS_URL is set so every worker shares one cache.
+# - The marts only change when dbt finishes, so every entry is tagged with the
+#   current run version: the finish time of the newest run in the dbt_run_log
+#   table (written by dbt's on-run-end hook wherever dbt runs), or of a local
+#   target/run_results.json if that is newer. A new run invalidates everything
+#   at once; the TTL is only a safety net.
+# - Concurrent misses for the same key share one database query.
+# - Hit/miss/eviction counters for the /api/cache/metrics endpoint.
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+
+DEFAULT_MAXSIZE = 1024
+DEFAULT_TTL = 300
+# How often the run version is re-read (seconds)
+VERSION_CHECK_SECONDS = 5
+DEFAULT_RUN_RESULTS = os.path.join("src", "dbt_project", "target", "run_results.json")
+# dbt commands that can change the marts
+MART_COMMANDS = ("run", "build", "seed")
+RUN_LOG_SQL = text("SELECT MAX(finished_at) FROM dbt_run_log")
+
+class MemoryBackend:
+    """Size-bounded LRU with per-entry expiry, local to one worker process."""
+
+    name = "memory"
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ttl):
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self):
+        self.entries.clear()
+
+    async def size(self):
+        return len(self.entries)
+
+class RedisBackend:
+    """
+    Shared backend: values are JSON strings with a Redis TTL. Eviction is left
+    to Redis (configure maxmemory-policy allkeys-lru). Keys carry the run
+    version, so entries of older runs are never read again and simply expire.
+    """
+
+    name = "redis"
+
+    def __init__(self, url, prefix="telegram-api:"):
+        import redis.asyncio as redis  # optional dependency
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self.evictions = 0
+
+    async def get(self, key):
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    async def clear(self):
+        pass
+
+    async def size(self):
+        return None
+
+def as_utc(moment):
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+class RunVersion:
+    """
+    Identifies the latest finished dbt run; re-read at most every VERSION_CHECK_SECONDS.
+
+    dbt_run_log is the authority, since it is shared by every host. A local
+    run_results.json only counts when it is newer than the newest logged run
+    (e.g. dbt run next to the API against a database without the hook yet).
+    """
+
+    def __init__(self, run_results=DEFAULT_RUN_RESULTS, check_seconds=VERSION_CHECK_SECONDS):
+        self.run_results = run_results
+        self.check_seconds = check_seconds
+        self.value = None
+        self.checked_at = None
+        self._mtime = None
+        self._file_finished_at = None
+        self._log_finished_at = None
+
+    def _from_run_results(self):
+        """Finish time of the last mart-changing run in run_results.json, or None."""
+        try:
+            mtime = os.path.getmtime(self.run_results)
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            try:
+                with open(self.run_results, "r", encoding="utf-8") as f:
+                    run_results = json.load(f)
+                generated_at = run_results["metadata"]["generated_at"]
+                self._mtime = mtime
+                # dbt test / docs also rewrite the file without touching the marts
+                if run_results.get("args", {}).get("which") in MART_COMMANDS:
+                    self._file_finished_at = as_utc(datetime.fromisoformat(generated_at.replace("Z", "+00:00")))
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Could not read {self.run_results}: {e}")
+        return self._file_finished_at
+
+    async def _from_run_log(self, engine):
+        """Finish time of the newest run in dbt_run_log; the last known one if the query fails."""
+        try:
+            async with engine.connect() as conn:
+                finished_at = (await conn.execute(RUN_LOG_SQL)).scalar()
+            self._log_finished_at = as_utc(finished_at) if finished_at else None
+        except Exception as e:
+            logging.warning(f"Could not read dbt_run_log: {e}")
+        return self._log_finished_at
+
+    async def current(self, engine):
+        now = time.monotonic()
+        if self.checked_at is None or now - self.checked_at >= self.check_seconds:
+            self.checked_at = now
+            finished = [moment for moment in (await self._from_run_log(engine), self._from_run_results()) if moment]
+            self.value = max(finished).isoformat() if finished else None
+        return self.value
+
+class ResponseCache:
+    """
+    Usage:
+        cache = ResponseCache.from_env()
+        data = await cache.get_or_load("top_products", {"limit": 10}, loader, engine)
+
+    `loader` is an async callable returning the (JSON-serializable) response.
+    """
+
+    def __init__(self, backend, ttl=DEFAULT_TTL, run_version=None, enabled=True):
+        self.backend = backend
+        self.ttl = ttl
+        self.run_version = run_version or RunVersion()
+        self.enabled = enabled
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self._version = None
+        self._inflight = {}
+
+    @classmethod
+    def from_env(cls):
+        redis_url = os.getenv("API_CACHE_REDIS_URL")
+        if redis_url:
+            backend = RedisBackend(redis_url)
+        else:
+            backend = MemoryBackend(int(os.getenv("API_CACHE_MAXSIZE", DEFAULT_MAXSIZE)))
+        return cls(
+            backend,
+            ttl=int(os.getenv("API_CACHE_TTL", DEFAULT_TTL)),
+            run_version=RunVersion(os.getenv("DBT_RUN_RESULTS", DEFAULT_RUN_RESULTS)),
+            enabled=os.getenv("API_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        )
+
+    @staticmethod
+    def make_key(endpoint, params, version):
+        encoded = json.dumps(jsonable_encoder(params), sort_keys=True)
+        digest = hashlib.sha1(encoded.encode()).hexdigest()
+        return f"{version}|{endpoint}|{digest}"
+
+    async def _check_version(self, engine):
+        version = await self.run_version.current(engine)
+        if version != self._version:
+            if self._version is not None:
+                self.invalidations += 1
+                logging.info(f"New pipeline run ({version}); response cache invalidated")
+            self._version = version
+            await self.backend.clear()
+        return version
+
+    async def get_or_load(self, endpoint, params, loader, engine):
+        if not self.enabled:
+            return await loader()
+
+        key = self.make_key(endpoint, params, await self._check_version(engine))
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        # Identical concurrent misses wait for the first one's query
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    # This request itself was cancelled
+                    raise
+                # The loading request was cancelled (client gone); load here instead
+                return await self.get_or_load(endpoint, params, loader, engine)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = jsonable_encoder(await loader())
+            await self.backend.set(key, value, self.ttl)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Only waiters should see the error; don't warn about an unread one
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled (client disconnect, shutdown): release the waiters too
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def metrics(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "run_version": self._version,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "evictions": self.backend.evictions,
+            "invalidations": self.invalidations,
+            "entries": await self.backend.size(),
+        }
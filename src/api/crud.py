@@ -3,31 +3,52 @@
 # Developed by: Addisu Taye Dadi
 # Purpose: Handle actual querying of dbt models
 # Key Features:
-# - Uses SQLAlchemy to query dbt-transformed data
-# - Modularizes query logic for reuse
+# - The API's only data-access layer: every endpoint query lives here
+# - Async SQLAlchemy connections from the pool in database.py
+# - Module-level text() statements with bound parameters, so each connection
+#   prepares a statement once and reuses it
 
-from sqlalchemy.engine import Engine
-from typing import List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from datetime import date
+from typing import List, Optional
 
-def get_top_products(engine: Engine, limit: int = 10) -> List[dict]:
-    result = engine.execute(f"""
-        SELECT message_text, COUNT(*) AS count
-        FROM fct_messages
-        WHERE message_text ILIKE '%paracetamol%' OR message_text ILIKE '%ibuprofen%'
-        GROUP BY message_text
-        ORDER BY count DESC
-        LIMIT {limit}
-    """).fetchall()
-    return [{"product": r[0], "count": r[1]} for r in result]
+from src.api import search
 
-def get_channel_activity(engine: Engine, channel_name: str) -> List[dict]:
-    result = engine.execute(f"""
-        SELECT d.year, d.month_name, COUNT(*) AS message_count
-        FROM fct_messages m
-        JOIN dim_channels c ON m.channel_id = c.channel_id
-        JOIN dim_dates d ON DATE(m.message_date) = d.date
-        WHERE c.channel_name = '{channel_name}'
-        GROUP BY d.year, d.month_name
-        ORDER BY d.date
-    """).fetchall()
-    return [{"year": r[0], "month": r[1], "message_count": r[2]} for r in result]
\ No newline at end of file
+# Reports read the small per-day aggregates built by dbt
+# (agg_daily_product_mentions, agg_daily_channel_activity), not fct_messages
+TOP_PRODUCTS_SQL = text("""
+    SELECT product, MIN(category) AS category, SUM(mention_count) AS count
+    FROM agg_daily_product_mentions
+    WHERE (CAST(:date_from AS DATE) IS NULL OR message_day >= CAST(:date_from AS DATE))
+      AND (CAST(:date_to AS DATE) IS NULL OR message_day <= CAST(:date_to AS DATE))
+    GROUP BY product
+    ORDER BY count DESC, product
+    LIMIT :limit
+""")
+
+CHANNEL_ACTIVITY_SQL = text("""
+    SELECT d.year, d.month_name, SUM(a.message_count) AS message_count
+    FROM agg_daily_channel_activity a
+    JOIN dim_channels c ON a.channel_id = c.channel_id
+    JOIN dim_dates d ON a.message_day = d.date
+    WHERE c.channel_name = :channel_name
+    GROUP BY d.year, d.month, d.month_name
+    ORDER BY d.year DESC, d.month DESC
+""")
+
+async def get_top_products(engine: AsyncEngine, limit: int = 10, date_from: Optional[date] = None,
+                           date_to: Optional[date] = None) -> List[dict]:
+    params = {"limit": limit, "date_from": date_from, "date_to": date_to}
+    async with engine.connect() as conn:
+        result = await conn.execute(TOP_PRODUCTS_SQL, params)
+        return [{"product": r[0], "category": r[1], "count": int(r[2])} for r in result]
+
+async def get_channel_activity(engine: AsyncEngine, channel_name: str) -> List[dict]:
+    async with engine.connect() as conn:
+        result = await conn.execute(CHANNEL_ACTIVITY_SQL, {"channel_name": channel_name})
+        return [{"year": int(r[0]), "month": r[1].strip(), "message_count": int(r[2])} for r in result]
+
+async def search_messages(engine: AsyncEngine, query: str, **filters) -> dict:
+    """One page of full-text search results; see search.search_messages."""
+    return await search.search_messages(engine, query, **filters)
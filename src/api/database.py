@@ -1,17 +1,57 @@
 # File Path: src/api/database.py
 # Date: July 10, 2025
 # Developed by: Addisu Taye Dadi
-# Purpose: Set up database connection engine
+# Purpose: Set up the API's database connection pool
 # Key Features:
 # - Uses environment variables for secure credentials
-# - Returns SQLAlchemy engine for querying dbt models
+# - One async SQLAlchemy engine (asyncpg) shared by every request
+# - Explicitly sized pool with pre-ping health checks and connection recycling
+# - asyncpg prepares each statement once per connection and reuses it
 
-from sqlalchemy import create_engine
 import os
 from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import create_async_engine
 
 load_dotenv()
 
+# Pool sizing: pool_size connections are kept open, up to max_overflow more
+# are opened under bursts, and a request waits at most pool_timeout seconds
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_TIMEOUT = 10
+DEFAULT_POOL_RECYCLE = 1800
+# Per-connection cache of prepared statements (asyncpg)
+PREPARED_STATEMENT_CACHE_SIZE = 256
+
+_engine = None
+
+def database_url(driver="asyncpg"):
+    return (
+        f"postgresql+{driver}://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    )
+
 def get_engine():
-    db_url = f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    return create_engine(db_url)
\ No newline at end of file
+    """Returns the process-wide async engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            database_url(),
+            pool_size=int(os.getenv("API_DB_POOL_SIZE", DEFAULT_POOL_SIZE)),
+            max_overflow=int(os.getenv("API_DB_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW)),
+            pool_timeout=int(os.getenv("API_DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT)),
+            pool_recycle=DEFAULT_POOL_RECYCLE,
+            pool_pre_ping=True,
+            connect_args={
+                "prepared_statement_cache_size": PREPARED_STATEMENT_CACHE_SIZE,
+                "server_settings": {"application_name": "telegram-analytics-api"},
+            },
+        )
+    return _engine
+
+async def dispose_engine():
+    """Closes every pooled connection (called on application shutdown)."""
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
@@ -5,28 +5,49 @@
 # Key Features:
 # - Exposes endpoints like /api/reports/top-products
 # - Uses Pydantic schemas for request/response validation
-# - Connects to PostgreSQL using environment variables
+# - Async endpoints on the pooled engine from database.py; queries live in crud.py
+# - Report and search responses are cached until the next dbt run (cache.py)
+# - Bulk exports are streamed from server-side cursors (export.py)
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine
-from pydantic import BaseModel
-import os
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Literal, Optional
 import logging
 
-# Load environment variables
-load_dotenv()
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+
+from src.api import crud
+from src.api.cache import ResponseCache
+from src.api.database import get_engine, dispose_engine
+from src.api.export import export_stream, InvalidExportRequest, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE
+from src.api.schemas import ProductReportItem, ChannelActivityItem, MessageSearchPage, CacheMetrics
+from src.api.search import InvalidCursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# One cache per worker process (shared across workers with API_CACHE_REDIS_URL)
+cache = ResponseCache.from_env()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The pool opens connections lazily; only its configuration is built here
+    get_engine()
+    logger.info("✅ PostgreSQL connection pool configured")
+    logger.info(f"🗃️ Response cache: {cache.backend.name}, TTL {cache.ttl}s, enabled={cache.enabled}")
+    yield
+    await dispose_engine()
+    logger.info("🔌 PostgreSQL connection pool closed")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Telegram Analytics API",
     description="An API to access insights derived from Ethiopian medical Telegram channels",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware to allow all origins during development
@@ -38,34 +59,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# PostgreSQL connection using environment variables
-try:
-    db_url = f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    engine = create_engine(db_url)
-    logger.info("✅ Successfully connected to PostgreSQL")
-except Exception as e:
-    logger.error(f"❌ Failed to connect to PostgreSQL: {e}")
-    raise
-
-# Optional: Define a base model for structured responses
-class ProductReportItem(BaseModel):
-    product: str
-    count: int
-
-class ChannelActivityItem(BaseModel):
-    year: int
-    month: str
-    message_count: int
-
-class MessageSearchResult(BaseModel):
-    message_id: int
-    text: str
-    date: str | None
-    channel: str
-
 # Sample endpoint to test if API is running
 @app.get("/")
-def root():
+async def root():
     return {
         "status": "Online",
         "message": "Welcome to the Telegram analytics API",
@@ -73,77 +69,125 @@ def root():
         "endpoints": [
             "/api/reports/top-products?limit=10",
             "/api/channels/{channel_name}/activity",
-            "/api/search/messages?query=paracetamol"
+            "/api/search/messages?query=paracetamol&channel=&date_from=&date_to=&limit=20&cursor=",
+            "/api/export/messages?format=ndjson&channel=&date_from=&date_to=&after=",
+            "/api/export/detections?format=csv",
+            "/api/cache/metrics"
         ]
     }
 
 # Endpoint: Get Top Products Mentioned in Messages
 @app.get("/api/reports/top-products", response_model=list[ProductReportItem])
-def top_products(limit: int = 10):
+async def top_products(
+    limit: int = Query(10, ge=1, le=100),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
     """
-    Returns the most frequently mentioned products or drugs in Telegram messages.
-    Example: paracetamol, ibuprofen, etc.
+    Returns the most frequently mentioned products or drugs in Telegram messages,
+    optionally within a date range.
+    Example: paracetamol, ibuprofen, etc. (see the dbt product_lexicon seed)
     """
     try:
-        result = engine.execute(f"""
-            SELECT message_text, COUNT(*) AS count
-            FROM fct_messages
-            WHERE message_text ILIKE '%paracetamol%' OR message_text ILIKE '%ibuprofen%'
-            GROUP BY message_text
-            ORDER BY count DESC
-            LIMIT {limit}
-        """).fetchall()
-        logger.info(f"📊 Fetched top {limit} products")
-        return [{"product": r[0], "count": r[1]} for r in result]
+        engine = get_engine()
+        products = await cache.get_or_load(
+            "top_products", {"limit": limit, "date_from": date_from, "date_to": date_to},
+            lambda: crud.get_top_products(engine, limit, date_from, date_to), engine
+        )
     except Exception as e:
         logger.error(f"🚨 Error fetching top products: {e}")
-        return {"error": str(e)}
+        raise HTTPException(status_code=500, detail="Could not fetch top products")
+    logger.info(f"📊 Fetched top {limit} products")
+    return products
 
 # Endpoint: Get Posting Activity for a Specific Channel
 @app.get("/api/channels/{channel_name}/activity", response_model=list[ChannelActivityItem])
-def channel_activity(channel_name: str):
+async def channel_activity(channel_name: str):
     """
     Returns daily/weekly/monthly activity for a specific Telegram channel.
     Used to analyze posting trends over time.
     """
     try:
-        result = engine.execute(f"""
-            SELECT d.year, d.month_name, COUNT(*) AS message_count
-            FROM fct_messages m
-            JOIN dim_channels c ON m.channel_id = c.channel_id
-            JOIN dim_dates d ON DATE(m.message_date) = d.date
-            WHERE c.channel_name = '{channel_name}'
-            GROUP BY d.year, d.month_name
-            ORDER BY d.date DESC
-        """).fetchall()
-        logger.info(f"📈 Fetched activity data for channel: {channel_name}")
-        return [{"year": r[0], "month": r[1], "message_count": r[2]} for r in result]
+        engine = get_engine()
+        activity = await cache.get_or_load(
+            "channel_activity", {"channel_name": channel_name},
+            lambda: crud.get_channel_activity(engine, channel_name), engine
+        )
     except Exception as e:
         logger.error(f"🚨 Error fetching activity for {channel_name}: {e}")
-        return {"error": str(e)}
+        raise HTTPException(status_code=500, detail="Could not fetch channel activity")
+    logger.info(f"📈 Fetched activity data for channel: {channel_name}")
+    return activity
 
 # Endpoint: Search for Messages Containing a Keyword
-@app.get("/api/search/messages")
-def search_messages(query: str):
+@app.get("/api/search/messages", response_model=MessageSearchPage)
+async def search_messages(
+    query: str = Query(..., min_length=1),
+    channel: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Literal["relevance", "recent"] = "relevance"
+):
     """
-    Search for messages containing a specific keyword (e.g., drug name).
-    Useful for monitoring availability or price changes across channels.
+    Full-text search for messages containing a keyword (e.g., drug name),
+    optionally within one channel and a date range.
+    Supports web-search syntax: "exact phrase", OR, -excluded.
+    sort=relevance ranks the newest 1000 matches; sort=recent covers every match.
+    Results come one page at a time; pass `next_cursor` as `cursor` for the next page.
     """
     try:
-        result = engine.execute(f"""
-            SELECT m.message_id, m.message_text, m.message_date, c.channel_name
-            FROM fct_messages m
-            JOIN dim_channels c ON m.channel_id = c.channel_id
-            WHERE m.message_text ILIKE '%{query}%'
-            ORDER BY m.message_date DESC
-        """).fetchall()
-        logger.info(f"🔍 Searched for '{query}' in messages")
-        return [{
-            "message_id": r[0],
-            "text": r[1],
-            "date": r[2],
-            "channel": r[3]
-        } for r in result]
+        engine = get_engine()
+        params = {"query": query, "channel": channel, "date_from": date_from, "date_to": date_to,
+                  "limit": limit, "cursor": cursor, "sort": sort}
+        page = await cache.get_or_load(
+            "search_messages", params, lambda: crud.search_messages(engine, **params), engine
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"🚨 Error searching messages: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Search failed")
+    logger.info(f"🔍 Searched for '{query}': {len(page['results'])} results")
+    return page
+
+# Endpoint: Stream a Bulk Export
+@app.get("/api/export/{dataset}")
+async def export_dataset(
+    dataset: Literal["messages", "detections"],
+    format: Literal["ndjson", "csv", "arrow"] = "ndjson",
+    channel: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE)
+):
+    """
+    Streams fct_messages or the YOLO detections as NDJSON, CSV or Arrow IPC,
+    optionally for one channel and a date range.
+    Rows are ordered by key (channel_id, message_id for messages; detection_id
+    for detections); resume an interrupted export with `after=<last key>`,
+    e.g. `after=-4242:1234` or `after=98765`.
+    """
+    try:
+        body, media_type = export_stream(
+            get_engine(), dataset, format, chunk_size=chunk_size, channel=channel,
+            date_from=date_from, date_to=date_to, after=after, limit=limit
+        )
+    except InvalidExportRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"📦 Exporting {dataset} as {format}")
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{dataset}.{format}"'
+    })
+
+# Endpoint: Response Cache Statistics
+@app.get("/api/cache/metrics", response_model=CacheMetrics)
+async def cache_metrics():
+    """
+    Hit/miss counters of this worker's response cache and the pipeline run
+    version its entries belong to.
+    """
+    return await cache.metrics()
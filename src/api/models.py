@@ -6,7 +6,8 @@
 # - Reflects schema from dbt models
 # - Used for raw SQL or ORM-based queries
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Float, Boolean
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -14,21 +15,29 @@ Base = declarative_base()
 class FactMessage(Base):
     __tablename__ = 'fct_messages'
     
-    message_id = Column(Integer, primary_key=True)
+    # Telegram message ids are only unique within a channel
+    message_id = Column(BigInteger, primary_key=True)
     message_text = Column(String)
     message_date = Column(DateTime)
-    channel_id = Column(Integer, ForeignKey('dim_channels.channel_id'))
-    has_image = Column(Integer)
+    message_day = Column(Date)
+    channel_id = Column(BigInteger, ForeignKey('dim_channels.channel_id'), primary_key=True)
+    has_image = Column(Boolean)
+    image_analyzed = Column(Boolean)
+    object_count = Column(Integer)
+    max_confidence = Column(Float)
+    top_class = Column(String)
+    top_classes = Column(ARRAY(String))
+    extracted_at = Column(DateTime)
 
 class DimChannel(Base):
     __tablename__ = 'dim_channels'
     
-    channel_id = Column(Integer, primary_key=True)
+    channel_id = Column(BigInteger, primary_key=True)
     channel_name = Column(String)
 
 class DimDate(Base):
     __tablename__ = 'dim_dates'
     
-    date = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
     year = Column(Integer)
     month_name = Column(String)
\ No newline at end of file
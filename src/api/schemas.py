@@ -7,11 +7,12 @@
 # - Helps prevent malformed requests
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class ProductReportItem(BaseModel):
     product: str
+    category: Optional[str] = None
     count: int
 
 class ChannelActivityItem(BaseModel):
@@ -23,4 +24,22 @@ class MessageSearchResult(BaseModel):
     message_id: int
     text: str
     date: Optional[datetime]
-    channel: str
\ No newline at end of file
+    channel: str
+    rank: float
+
+class CacheMetrics(BaseModel):
+    enabled: bool
+    backend: str
+    run_version: Optional[str]
+    ttl_seconds: int
+    hits: int
+    misses: int
+    coalesced: int
+    hit_ratio: Optional[float]
+    evictions: int
+    invalidations: int
+    entries: Optional[int]
+
+class MessageSearchPage(BaseModel):
+    results: List[MessageSearchResult]
+    next_cursor: Optional[str] = None
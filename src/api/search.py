@@ -0,0 +1,173 @@
+# File Path: src/api/search.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Full-text message search over fct_messages for the API.
+# Key Features:
+# - Matches on the GIN-indexed fct_messages.message_tsv column with
+#   websearch_to_tsquery ("quoted phrases", OR, -exclusions), never ILIKE scans.
+# - Every user value is a bound parameter; runs on the async engine.
+# - Keyset (cursor) pagination: each page starts strictly after the last row
+#   of the previous one, so deep pages cost the same as the first.
+# - Optional channel and date-range filters; results ordered by recency (an
+#   index walk that stops after one page) or by ts_rank relevance among the
+#   newest RELEVANCE_CANDIDATES matches, so latency does not grow with the
+#   number of matches.
+
+import json
+import base64
+import binascii
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import text
+
+SEARCH_CONFIG = "simple"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+SORT_ORDERS = ("relevance", "recent")
+# Relevance ranking looks at this many of the newest matches
+RELEVANCE_CANDIDATES = 1000
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+def encode_cursor(sort: str, row) -> str:
+    """Opaque cursor pointing just past `row` (a result row of search_messages)."""
+    key = {
+        "sort": sort,
+        "date": row["message_date"].isoformat(),
+        "channel_id": row["channel_id"],
+        "message_id": row["message_id"],
+    }
+    if sort == "relevance":
+        key["rank"] = row["rank"]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if key["sort"] != sort:
+            raise InvalidCursor(f"cursor was issued for sort={key['sort']}")
+        key["date"] = datetime.fromisoformat(key["date"])
+        if sort == "relevance":
+            key["rank"] = float(key["rank"])
+        int(key["channel_id"]), int(key["message_id"])
+        return key
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"malformed cursor: {e}")
+
+def build_search_query(sort: str, channel: Optional[str], date_from: Optional[date],
+                       date_to: Optional[date], after: Optional[dict]):
+    """Returns (sql, extra bound params) for one page of results."""
+    filters = ["m.message_tsv @@ q.query", "m.message_date IS NOT NULL"]
+    params = {}
+    if channel:
+        filters.append("c.channel_name = :channel")
+        params["channel"] = channel
+    if date_from:
+        filters.append("m.message_day >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        filters.append("m.message_day <= :date_to")
+        params["date_to"] = date_to
+
+    # All sort keys descend, so "after the cursor" is one row comparison.
+    if after is not None:
+        params.update({
+            "after_date": after["date"],
+            "after_channel_id": after["channel_id"],
+            "after_message_id": after["message_id"],
+        })
+    recency_key = "(m.message_date, m.channel_id, m.message_id)"
+    recency_bound = "(CAST(:after_date AS TIMESTAMP), :after_channel_id, :after_message_id)"
+    recency_order = "m.message_date DESC, m.channel_id DESC, m.message_id DESC"
+
+    if sort == "recent":
+        # Walks the (message_date, channel_id, message_id) index newest first and
+        # stops after one page; ts_rank only runs on the rows returned
+        if after is not None:
+            filters.append(f"{recency_key} < {recency_bound}")
+        sql = f"""
+            WITH q AS (
+                SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :query) AS query
+            )
+            SELECT m.message_id, m.channel_id, c.channel_name, m.message_text, m.message_date,
+                   ts_rank(m.message_tsv, q.query) AS rank
+            FROM fct_messages m
+            CROSS JOIN q
+            JOIN dim_channels c ON m.channel_id = c.channel_id
+            WHERE {" AND ".join(filters)}
+            ORDER BY {recency_order}
+            LIMIT :limit
+        """
+        return sql, params
+
+    # Relevance: rank only the newest RELEVANCE_CANDIDATES matches, so a common
+    # term costs the same as a rare one however large the history grows
+    page_filter = ""
+    if after is not None:
+        page_filter = ("WHERE (rank, message_date, channel_id, message_id) < "
+                       "(CAST(:after_rank AS REAL), CAST(:after_date AS TIMESTAMP), :after_channel_id, :after_message_id)")
+        params["after_rank"] = after["rank"]
+    params["candidates"] = RELEVANCE_CANDIDATES
+    sql = f"""
+        WITH q AS (
+            SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :query) AS query
+        ),
+        candidates AS (
+            SELECT m.message_id, m.channel_id, c.channel_name, m.message_text, m.message_date,
+                   m.message_tsv, q.query
+            FROM fct_messages m
+            CROSS JOIN q
+            JOIN dim_channels c ON m.channel_id = c.channel_id
+            WHERE {" AND ".join(filters)}
+            ORDER BY {recency_order}
+            LIMIT :candidates
+        ),
+        ranked AS (
+            SELECT message_id, channel_id, channel_name, message_text, message_date,
+                   ts_rank(message_tsv, query) AS rank
+            FROM candidates
+        )
+        SELECT message_id, channel_id, channel_name, message_text, message_date, rank
+        FROM ranked
+        {page_filter}
+        ORDER BY rank DESC, message_date DESC, channel_id DESC, message_id DESC
+        LIMIT :limit
+    """
+    return sql, params
+
+async def search_messages(engine, query: str, channel: Optional[str] = None, date_from: Optional[date] = None,
+                    date_to: Optional[date] = None, limit: int = DEFAULT_PAGE_SIZE,
+                    cursor: Optional[str] = None, sort: str = "relevance") -> dict:
+    """
+    Returns {"results": [...], "next_cursor": str | None} for one page.
+    Pass `next_cursor` back as `cursor` to get the following page.
+    """
+    if sort not in SORT_ORDERS:
+        raise ValueError(f"sort must be one of {SORT_ORDERS}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = decode_cursor(cursor, sort) if cursor else None
+
+    sql, params = build_search_query(sort, channel, date_from, date_to, after)
+    # One extra row tells whether another page exists
+    params.update(query=query, limit=limit + 1)
+    async with engine.connect() as conn:
+        result = await conn.execute(text(sql), params)
+        rows = [dict(row._mapping) for row in result]
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "results": [{
+            "message_id": row["message_id"],
+            "text": row["message_text"],
+            "date": row["message_date"],
+            "channel": row["channel_name"],
+            "rank": row["rank"],
+        } for row in rows],
+        "next_cursor": encode_cursor(sort, rows[-1]) if has_more else None,
+    }
@@ -6,8 +6,11 @@
 # - Defines individual tasks as Dagster ops.
 # - Creates a job to run the full pipeline.
 # - Logs execution status for each step.
+# - YOLO runs in-process through a `yolo_detector` resource, so the model is
+#   loaded once per run instead of per subprocess, and its cold-start cost
+#   is reported.
 
-from dagster import op, job
+from dagster import op, job, resource, Field
 import asyncio
 import subprocess
 import logging
@@ -21,25 +24,26 @@ logger = logging.getLogger(__name__)
 # 📥 Op 1: Scrape Telegram Data
 #
 
-@op(description="Scrape messages from Telegram channels using Telethon")
+@op(description="Scrape messages and photos from Telegram channels using Telethon")
 def scrape_telegram_data():
     """
     Scrapes messages from a predefined list of Ethiopian medical Telegram channels.
-    Uses asyncio to handle async scraping function.
+    All channels are scraped concurrently over one shared Telegram client, and each
+    channel's photos are downloaded in the same pass into data/raw/images/ for YOLO.
     """
-    from src.scraping.telegram_scraper import scrape_channel
+    from src.scraping.scrape_runner import scrape_all
     
     CHANNELS = ['chemed123','lobelia4cosmetics', 'tikvahpharma']
     
-    logger.info("Starting Telegram scraping process...")
+    logger.info(f"Starting Telegram scraping process for {len(CHANNELS)} channels...")
     
-    async def run_scrape():
-        for channel in CHANNELS:
-            logger.info(f"Scraping data from channel: {channel}")
-            await scrape_channel(channel)
-    
-    asyncio.run(run_scrape())
+    results = asyncio.run(scrape_all(CHANNELS, images=True))
     
+    failed = [channel for channel, ok in results.items() if not ok]
+    if failed and len(failed) == len(results):
+        raise RuntimeError(f"Scraping failed for every channel: {failed}")
+    if failed:
+        logger.error(f"Channels that failed or were abandoned after FloodWait retries: {failed}")
     logger.info("Finished scraping all channels.")
 
 #
@@ -56,7 +60,7 @@ def load_raw_to_postgres():
     
     # Replace with actual implementation or call external script
     try:
-        subprocess.run(["python", "src/scraping/load_data.py"], check=True)
+        subprocess.run(["python", "-m", "src.scraping.load_data"], check=True)
         logger.info("Raw data successfully loaded into PostgreSQL.")
     except subprocess.CalledProcessError as e:
         logger.error(f"Failed to load raw data: {e}")
@@ -87,36 +91,72 @@ def run_dbt_transformations():
         logger.error(f"dbt transformation failed: {e.stderr}")
         raise
 
+#
+# 🧠 Resource: Warm YOLOv8 Detector
+#
+
+@resource(
+    config_schema={
+        "weights": Field(str, default_value="yolov8s.pt"),
+        "backend": Field(str, default_value="torch", description="torch or onnx"),
+        "batch_size": Field(int, default_value=16),
+        "imgsz": Field(int, default_value=640),
+    },
+    description="YOLOv8 detector loaded once and shared by every op in the run"
+)
+def yolo_detector(init_context):
+    """
+    Loads the detector when the first op needing it starts and releases it
+    when the run ends. Cold-start timings are logged.
+    """
+    from src.yolo.detector import Detector
+
+    config = init_context.resource_config
+    detector = Detector(config["weights"], config["backend"], config["imgsz"], config["batch_size"])
+    detector.load()
+    init_context.log.info(f"YOLO detector cold start: {detector.startup}")
+    try:
+        yield detector
+    finally:
+        detector.close()
+
 #
 # 🖼️ Op 4: Enrich Images Using YOLOv8
 #
 
-@op(description="Run YOLOv8 object detection on downloaded images")
-def run_yolo_enrichment():
+@op(description="Run YOLOv8 object detection on downloaded images", required_resource_keys={"yolo_detector"})
+def run_yolo_enrichment(context):
     """
     Runs YOLOv8 inference on downloaded Telegram images to extract visual insights.
     Results are inserted into the warehouse for analysis.
     """
+    from src.yolo.image_analyzer import analyze_images, get_connection
+
     logger.info("Running YOLO image detection...")
-    
+    detector = context.resources.yolo_detector
+
+    conn = get_connection()
     try:
-        result = subprocess.run(
-            ["python", "src/yolo/image_analyzer.py"],
-            check=True,
-            capture_output=True,
-            text=True
+        summary = analyze_images(detector, conn)
+        logger.info(
+            f"YOLO enrichment completed successfully: {summary['images']} images, "
+            f"{summary['detections']} detections in {summary['seconds']:.1f}s "
+            f"(model startup {detector.startup.get('total_s', 0):.1f}s)"
         )
-        logger.info("YOLO enrichment completed successfully.")
-        logger.debug(result.stdout)
-    except subprocess.CalledProcessError as e:
-        logger.error(f"YOLO enrichment failed: {e.stderr}")
+    except Exception as e:
+        logger.error(f"YOLO enrichment failed: {e}")
         raise
+    finally:
+        conn.close()
 
 #
 # ⚙️ Job Definition: Full Pipeline
 #
 
-@job(description="Full end-to-end pipeline: scrape → load → transform → enrich")
+@job(
+    description="Full end-to-end pipeline: scrape → load → transform → enrich",
+    resource_defs={"yolo_detector": yolo_detector}
+)
 def full_pipeline():
     """
     Defines the full DAG of operations to be orchestrated by Dagster.
@@ -0,0 +1,42 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_id', 'message_day'],
+        indexes=[
+            {'columns': ['channel_id', 'message_day'], 'unique': True}
+        ]
+    )
+}}
+
+-- Posts per channel and day, so activity reports read one row per day instead
+-- of counting fct_messages. Incremental runs recompute the (channel, day) pairs
+-- with restaged messages or re-analyzed images.
+{% if is_incremental() %}
+WITH changed AS (
+    SELECT DISTINCT channel_id, message_day
+    FROM {{ ref('fct_messages') }}
+    WHERE extracted_at > (
+        SELECT COALESCE(MAX(last_extracted_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+    ) - INTERVAL '{{ var("incremental_lookback_minutes") }} minutes'
+       OR image_processed_at > (
+        SELECT COALESCE(MAX(last_image_processed_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+    )
+)
+{% endif %}
+
+SELECT
+    m.channel_id,
+    m.message_day,
+    COUNT(*) AS message_count,
+    COUNT(*) FILTER (WHERE m.has_image) AS image_message_count,
+    COUNT(*) FILTER (WHERE m.object_count > 0) AS messages_with_objects,
+    MAX(m.extracted_at) AS last_extracted_at,
+    MAX(m.image_processed_at) AS last_image_processed_at
+FROM {{ ref('fct_messages') }} m
+{% if is_incremental() %}
+JOIN changed k
+    ON k.channel_id = m.channel_id
+   AND k.message_day = m.message_day
+{% endif %}
+GROUP BY m.channel_id, m.message_day
@@ -0,0 +1,56 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['message_day'],
+        indexes=[
+            {'columns': ['message_day', 'product'], 'unique': True},
+            {'columns': ['product']}
+        ],
+        pre_hook="""
+            {% if is_incremental() %}
+            -- delete+insert only replaces days present in the new result; a day
+            -- whose last mention was edited away must be cleared here
+            DELETE FROM {{ this }}
+            WHERE message_day IN (
+                SELECT message_day
+                FROM {{ ref('fct_messages') }}
+                WHERE message_day IS NOT NULL
+                  AND extracted_at > (
+                    SELECT COALESCE(MAX(last_extracted_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+                ) - INTERVAL '{{ var("incremental_lookback_minutes") }} minutes'
+            )
+            {% endif %}
+        """
+    )
+}}
+
+-- Messages mentioning each product per day: the top-products report sums a few
+-- hundred of these rows instead of scanning message text. Incremental runs
+-- recompute whole days with restaged messages. The pre-hook empties those days
+-- first, so a day whose edits removed every mention ends up with no rows. It
+-- also lowers MAX(last_extracted_at), which only widens the window below to
+-- more days that are then replaced as usual.
+{% if is_incremental() %}
+WITH changed_days AS (
+    SELECT DISTINCT message_day
+    FROM {{ ref('fct_messages') }}
+    WHERE message_day IS NOT NULL
+      AND extracted_at > (
+        SELECT COALESCE(MAX(last_extracted_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+    ) - INTERVAL '{{ var("incremental_lookback_minutes") }} minutes'
+)
+{% endif %}
+
+SELECT
+    p.message_day,
+    p.product,
+    MIN(p.category) AS category,
+    COUNT(*) AS mention_count,
+    COUNT(DISTINCT p.channel_id) AS channel_count,
+    MAX(p.extracted_at) AS last_extracted_at
+FROM {{ ref('fct_product_mentions') }} p
+{% if is_incremental() %}
+WHERE p.message_day IN (SELECT message_day FROM changed_days)
+{% endif %}
+GROUP BY p.message_day, p.product
@@ -1,7 +1,21 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='table',
+        indexes=[
+            {'columns': ['channel_id'], 'unique': True},
+            {'columns': ['channel_name'], 'unique': True}
+        ]
+    )
+}}
 
-SELECT DISTINCT
-    ROW_NUMBER() OVER () AS channel_id,
+-- channel_id is derived from the channel name (first 64 bits of its md5), so
+-- it is stable across runs and full refreshes, and incremental facts keep
+-- pointing at the right channel.
+SELECT
+    ('x' || LEFT(MD5(channel), 16))::BIT(64)::BIGINT AS channel_id,
     channel AS channel_name
-FROM {{ ref('stg_telegram_messages') }}
-WHERE channel IS NOT NULL
\ No newline at end of file
+FROM (
+    SELECT DISTINCT channel
+    FROM {{ ref('stg_telegram_messages') }}
+    WHERE channel IS NOT NULL
+) AS channels
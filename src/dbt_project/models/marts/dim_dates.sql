@@ -1,8 +1,15 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='table',
+        indexes=[
+            {'columns': ['date'], 'unique': True}
+        ]
+    )
+}}
 
 WITH raw_dates AS (
     SELECT DISTINCT
-        TO_DATE(message_date, 'YYYY-MM-DD"T"HH24:MI:SS') AS message_date
+        message_date::DATE AS message_date
     FROM {{ ref('stg_telegram_messages') }}
     WHERE message_date IS NOT NULL
 ),
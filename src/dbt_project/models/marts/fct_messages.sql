@@ -1,7 +1,65 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_id', 'message_id'],
+        indexes=[
+            {'columns': ['channel_id', 'message_id'], 'unique': True},
+            {'columns': ['channel_id', 'message_date']},
+            {'columns': ['message_date', 'channel_id', 'message_id']},
+            {'columns': ['message_day']},
+            {'columns': ['extracted_at']},
+            {'columns': ['message_text gin_trgm_ops'], 'type': 'gin'},
+            {'columns': ['message_tsv'], 'type': 'gin'}
+        ]
+    )
+}}
+
+{% if is_incremental() %}
+-- Rebuild only messages that were (re)staged or whose image was (re)analyzed
+-- since the last run
+WITH changed AS (
+    SELECT channel, message_id
+    FROM {{ ref('stg_telegram_messages') }}
+    WHERE extracted_at > (
+        SELECT COALESCE(MAX(extracted_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+    ) - INTERVAL '{{ var("incremental_lookback_minutes") }} minutes'
+
+    UNION
+
+    SELECT channel, message_id
+    FROM {{ ref('agg_message_detections') }}
+    WHERE last_processed_at > (
+        SELECT COALESCE(MAX(image_processed_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+    ) - INTERVAL '{{ var("incremental_lookback_minutes") }} minutes'
+)
+{% endif %}
+
+-- Image columns come from agg_message_detections, so API queries on visual
+-- content need no runtime aggregation over raw.fct_image_detections.
 SELECT
-    message_id,
-    message_text,
-    message_date,
-    c.channel_id
+    m.message_id,
+    m.message_text,
+    -- 'simple' config: no stemming or stop words, since posts mix Amharic and English
+    to_tsvector('simple', COALESCE(m.message_text, '')) AS message_tsv,
+    m.message_date,
+    m.message_date::DATE AS message_day,
+    c.channel_id,
+    (m.has_photo OR d.message_id IS NOT NULL) AS has_image,
+    d.message_id IS NOT NULL AS image_analyzed,
+    COALESCE(d.object_count, 0) AS object_count,
+    d.max_confidence,
+    d.top_class,
+    d.top_classes,
+    m.extracted_at,
+    d.last_processed_at AS image_processed_at
 FROM {{ ref('stg_telegram_messages') }} m
-JOIN {{ ref('dim_channels') }} c ON m.channel = c.channel_name
\ No newline at end of file
+{% if is_incremental() %}
+JOIN changed k
+    ON k.channel = m.channel
+   AND k.message_id = m.message_id
+{% endif %}
+JOIN {{ ref('dim_channels') }} c ON m.channel = c.channel_name
+LEFT JOIN {{ ref('agg_message_detections') }} d
+    ON d.channel = m.channel
+   AND d.message_id = m.message_id
@@ -0,0 +1,65 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_id', 'message_id'],
+        indexes=[
+            {'columns': ['channel_id', 'message_id', 'product'], 'unique': True},
+            {'columns': ['message_day', 'product']}
+        ],
+        pre_hook="""
+            {% if is_incremental() %}
+            -- A restaged message whose edit dropped every product yields no rows,
+            -- so delete+insert would never touch its old mentions: clear the
+            -- mentions of every message restaged since they were written.
+            DELETE FROM {{ this }} p
+            USING {{ ref('fct_messages') }} m
+            WHERE m.channel_id = p.channel_id
+              AND m.message_id = p.message_id
+              AND m.extracted_at > p.extracted_at
+              AND m.extracted_at > (
+                  SELECT COALESCE(MAX(extracted_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+              ) - INTERVAL '{{ var("incremental_lookback_minutes") }} minutes'
+            {% endif %}
+        """
+    )
+}}
+
+-- One row per (message, product) mentioned in its text, using the terms of the
+-- product_lexicon seed. Terms are matched as whole words/phrases on the
+-- GIN-indexed message_tsv, so the lexicon drives index lookups instead of a
+-- regex scan per term. Incremental runs only re-read recently loaded messages
+-- and replace all mentions of each (the pre-hook drops mentions of restaged
+-- messages first); rebuild with --full-refresh after changing the lexicon.
+WITH lexicon AS (
+    SELECT
+        product,
+        category,
+        term,
+        phraseto_tsquery('simple', term) AS term_query
+    FROM {{ ref('product_lexicon') }}
+    WHERE NULLIF(TRIM(term), '') IS NOT NULL
+),
+
+messages AS (
+    SELECT channel_id, message_id, message_tsv, message_date, message_day, extracted_at
+    FROM {{ ref('fct_messages') }}
+    {% if is_incremental() %}
+    WHERE extracted_at > (
+        SELECT COALESCE(MAX(extracted_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+    ) - INTERVAL '{{ var("incremental_lookback_minutes") }} minutes'
+    {% endif %}
+)
+
+SELECT
+    m.channel_id,
+    m.message_id,
+    l.product,
+    MIN(l.category) AS category,
+    ARRAY_AGG(DISTINCT l.term ORDER BY l.term) AS matched_terms,
+    m.message_date,
+    m.message_day,
+    m.extracted_at
+FROM messages m
+JOIN lexicon l ON m.message_tsv @@ l.term_query
+GROUP BY m.channel_id, m.message_id, l.product, m.message_date, m.message_day, m.extracted_at
@@ -1,11 +1,39 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel', 'message_id'],
+        indexes=[
+            {'columns': ['channel', 'message_id'], 'unique': True},
+            {'columns': ['extracted_at']}
+        ]
+    )
+}}
+
 WITH raw_data AS (
     SELECT * FROM {{ source('raw', 'telegram_messages') }}
+    {% if is_incremental() %}
+    -- Only rows loaded since the last run, read through the extracted_at index
+    -- on raw.telegram_messages (see src/scraping/raw_schema.py). The lookback
+    -- covers loads that were still committing while the previous run read
+    -- MAX(extracted_at).
+    WHERE extracted_at > (
+        SELECT COALESCE(MAX(extracted_at), '1900-01-01'::TIMESTAMP) FROM {{ this }}
+    ) - INTERVAL '{{ var("incremental_lookback_minutes") }} minutes'
+    {% endif %}
 )
 
+-- Message ids are only unique within a channel; (channel, message_id) is the key.
+-- This query has no channel predicate, so all partitions are read, each through
+-- its extracted_at index.
+-- Types are fixed here once: Telethon dates are ISO-8601 with a UTC offset and
+-- are stored as UTC timestamps, so downstream models never parse text.
 SELECT
-    (message_json->>'id')::INT AS message_id,
+    id::BIGINT AS message_id,
     message_json->>'text' AS message_text,
-    message_json->>'date' AS message_date,
-    channel  -- Make sure this line exists
+    ((message_json->>'date')::TIMESTAMPTZ AT TIME ZONE 'UTC') AS message_date,
+    channel,
+    COALESCE(message_json->'media'->>'_' = 'MessageMediaPhoto', FALSE) AS has_photo,
+    extracted_at
 FROM raw_data
-WHERE message_json->>'text' IS NOT NULL
\ No newline at end of file
+WHERE message_json->>'text' IS NOT NULL
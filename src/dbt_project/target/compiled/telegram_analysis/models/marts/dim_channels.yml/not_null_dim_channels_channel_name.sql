@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select channel_name
-from "telegram_data"."raw"."dim_channels"
-where channel_name is null
-
-
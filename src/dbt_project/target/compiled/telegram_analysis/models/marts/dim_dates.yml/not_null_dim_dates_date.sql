@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select date
-from "telegram_data"."raw"."dim_dates"
-where date is null
-
-
@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select channel_id
-from "telegram_data"."raw"."fct_messages"
-where channel_id is null
-
-
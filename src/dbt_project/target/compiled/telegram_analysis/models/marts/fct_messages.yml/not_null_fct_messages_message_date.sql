@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select message_date
-from "telegram_data"."raw"."fct_messages"
-where message_date is null
-
-
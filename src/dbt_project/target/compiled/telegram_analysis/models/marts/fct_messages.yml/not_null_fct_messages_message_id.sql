@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select message_id
-from "telegram_data"."raw"."fct_messages"
-where message_id is null
-
-
@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select message_text
-from "telegram_data"."raw"."fct_messages"
-where message_text is null
-
-
@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select message_date
-from "telegram_data"."raw"."stg_telegram_messages"
-where message_date is null
-
-
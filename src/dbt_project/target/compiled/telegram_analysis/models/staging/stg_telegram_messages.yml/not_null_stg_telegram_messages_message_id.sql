@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select message_id
-from "telegram_data"."raw"."stg_telegram_messages"
-where message_id is null
-
-
@@ -1,11 +0,0 @@
-
-    
-    
-
-
-
-select message_text
-from "telegram_data"."raw"."stg_telegram_messages"
-where message_text is null
-
-
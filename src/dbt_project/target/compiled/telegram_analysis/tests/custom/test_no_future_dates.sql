@@ -1,3 +0,0 @@
-SELECT *
-FROM "telegram_data"."raw"."fct_messages"
-WHERE message_date::date > CURRENT_DATE
\ No newline at end of file
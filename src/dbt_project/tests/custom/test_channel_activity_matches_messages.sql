@@ -0,0 +1,5 @@
+-- The daily channel aggregate must account for every message in fct_messages
+SELECT a.total, m.total
+FROM (SELECT COALESCE(SUM(message_count), 0) AS total FROM {{ ref('agg_daily_channel_activity') }}) a
+CROSS JOIN (SELECT COUNT(*) AS total FROM {{ ref('fct_messages') }}) m
+WHERE a.total <> m.total
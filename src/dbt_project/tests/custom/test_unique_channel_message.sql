@@ -0,0 +1,5 @@
+-- Telegram message ids are only unique within a channel
+SELECT channel, message_id, COUNT(*) AS occurrences
+FROM {{ ref('stg_telegram_messages') }}
+GROUP BY channel, message_id
+HAVING COUNT(*) > 1
@@ -0,0 +1,5 @@
+-- Each (channel_id, message_id) pair appears once in the fact table
+SELECT channel_id, message_id, COUNT(*) AS occurrences
+FROM {{ ref('fct_messages') }}
+GROUP BY channel_id, message_id
+HAVING COUNT(*) > 1
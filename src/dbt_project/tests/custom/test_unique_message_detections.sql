@@ -0,0 +1,5 @@
+-- agg_message_detections holds one row per (channel, message_id)
+SELECT channel, message_id, COUNT(*) AS occurrences
+FROM {{ ref('agg_message_detections') }}
+GROUP BY channel, message_id
+HAVING COUNT(*) > 1
@@ -0,0 +1,5 @@
+-- Each product is counted once per message
+SELECT channel_id, message_id, product, COUNT(*) AS occurrences
+FROM {{ ref('fct_product_mentions') }}
+GROUP BY channel_id, message_id, product
+HAVING COUNT(*) > 1
@@ -5,14 +5,30 @@
 # Key Features:
 # - Extracts media URLs from scraped messages.
 # - Downloads and stores images locally for YOLO processing.
+# - Bounded-concurrency download pool instead of one photo at a time.
+# - Persistent index of downloaded message ids so reruns only fetch new photos;
+#   each download is appended to a journal, and the full index is rewritten
+#   only when a pool closes.
+# - Content-hash dedup: reposted images are stored once (hard-linked per message).
+# - Progress and throughput summary instead of per-file console output.
+# - Optional hand-off of every saved image to the streaming YOLO detector
+#   through a spool directory (see image_spool.py).
 
 from telethon.sync import TelegramClient
-from telethon.tl.types import Photo
+from telethon.errors import FloodWaitError
+from telethon.tl.types import InputMessagesFilterPhotos
 import os
+import json
+import time
+import hashlib
 import logging
+import argparse
 from dotenv import load_dotenv
 import asyncio
 
+from src.scraping.scrape_state import STATE_DIR, load_state, save_state
+from src.scraping.image_spool import ImageSpool
+
 # Load environment variables
 load_dotenv()
 
@@ -27,54 +43,307 @@ logging.basicConfig(
 api_id = os.getenv("TELEGRAM_API_ID")
 api_hash = os.getenv("TELEGRAM_API_HASH")
 
-async def download_images(channel_username):
+# Same layout the YOLO stage reads: data/raw/images/<channel>/<message_id>.jpg
+IMAGE_ROOT = "data/raw/images"
+IMAGE_INDEX_FILE = os.path.join(STATE_DIR, "image_index.json")
+DEFAULT_DOWNLOAD_CONCURRENCY = 4
+PROGRESS_EVERY = 100
+
+class ImageIndex:
+    """
+    Persistent index of downloaded images.
+
+    - messages:   "<channel>/<message_id>" -> sha256 of the image content
+    - hashes:     sha256 -> path of a stored copy that still exists
+    - watermarks: channel -> newest message id of the last *complete* pass;
+                  the next run only walks messages newer than this
+
+    New downloads are appended to `<path>.log` (one JSON line each), so
+    recording costs the same however large the index is and a crash loses
+    nothing; save() folds the journal into the JSON file and empties it.
+    """
+
+    def __init__(self, path=IMAGE_INDEX_FILE):
+        self.path = path
+        self.journal_path = f"{path}.log"
+        state = load_state(path, {"messages": {}, "hashes": {}, "watermarks": {}})
+        self.messages = state.get("messages", {})
+        self.hashes = state.get("hashes", {})
+        self.watermarks = state.get("watermarks", {})
+        self._journal = None
+        self._replay_journal()
+
+    def _replay_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line cut short by a crash
+                    continue
+                self.messages[entry["key"]] = entry["digest"]
+                if entry.get("path"):
+                    self.hashes[entry["digest"]] = entry["path"]
+
+    @staticmethod
+    def _key(channel, message_id):
+        return f"{channel}/{message_id}"
+
+    def has(self, channel, message_id):
+        return self._key(channel, message_id) in self.messages
+
+    def watermark(self, channel):
+        """Newest message id covered by a complete download pass (0 if none)."""
+        return self.watermarks.get(channel, 0)
+
+    def advance_watermark(self, channel, message_id):
+        if message_id > self.watermark(channel):
+            self.watermarks[channel] = message_id
+
+    def path_for_hash(self, digest):
+        path = self.hashes.get(digest)
+        return path if path and os.path.exists(path) else None
+
+    def record(self, channel, message_id, digest, path):
+        key = self._key(channel, message_id)
+        self.messages[key] = digest
+        # Keep the first stored copy while it exists; once it is gone, the new
+        # file becomes the copy later duplicates link to
+        new_path = None
+        if self.path_for_hash(digest) is None:
+            self.hashes[digest] = new_path = path
+
+        if self._journal is None:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps({"key": key, "digest": digest, "path": new_path}) + "\n")
+        self._journal.flush()
+
+    def save(self):
+        """Rewrites the full index and empties the journal (once per pool, not per photo)."""
+        save_state(self.path, {
+            "messages": self.messages,
+            "hashes": self.hashes,
+            "watermarks": self.watermarks
+        })
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+class DownloadStats:
+    """Counters for the progress and throughput summary."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.downloaded = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+
+    def summary(self, label):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (
+            f"{label}: {self.downloaded} downloaded, {self.duplicates} deduplicated, "
+            f"{self.skipped} already present, {self.failed} failed in {elapsed:.1f}s "
+            f"({self.downloaded / elapsed:.1f} photos/s, {self.bytes / elapsed / 1024 / 1024:.2f} MB/s)"
+        )
+
+class ImageDownloadPool:
+    """
+    Downloads photos for one channel with a bounded number of concurrent workers.
+
+    When a `spool` (ImageSpool) is given, every saved image is pushed to it
+    so the streaming detector can pick it up within seconds.
+
+    Usage:
+        pool = ImageDownloadPool("tikvahpharma", media_dir, index)
+        await pool.start()
+        async for message in client.iter_messages(channel):
+            await pool.submit(message)
+        stats = await pool.close()
+    """
+
+    def __init__(self, channel, media_dir, index, concurrency=DEFAULT_DOWNLOAD_CONCURRENCY, spool=None):
+        self.channel = channel
+        self.media_dir = media_dir
+        self.index = index
+        self.spool = spool
+        self.concurrency = max(1, concurrency)
+        self.stats = DownloadStats()
+        self._queue = asyncio.Queue(maxsize=self.concurrency * 4)
+        self._workers = []
+
+    async def start(self):
+        os.makedirs(self.media_dir, exist_ok=True)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def submit(self, message):
+        """Queues a message's photo unless it was downloaded on a previous run."""
+        if not message.photo:
+            return
+        if self.index.has(self.channel, message.id):
+            self.stats.skipped += 1
+            return
+        await self._queue.put(message)
+
+    async def close(self):
+        """Waits for queued downloads to finish, persists the index and logs a summary."""
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self.index.save()
+
+        summary = self.stats.summary(self.channel)
+        logging.info(summary)
+        print(summary)
+        return self.stats
+
+    async def _worker(self):
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._download_with_retry(message)
+            except Exception as e:
+                self.stats.failed += 1
+                logging.error(f"Failed to download image from message {message.id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _download_with_retry(self, message, max_attempts=3):
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return await self._download(message)
+            except FloodWaitError as e:
+                if attempt == max_attempts:
+                    raise
+                logging.warning(f"FloodWait of {e.seconds}s while downloading message {message.id}")
+                await asyncio.sleep(e.seconds)
+
+    async def _download(self, message):
+        # Generate a unique file name based on message ID
+        file_path = os.path.join(self.media_dir, f"{message.id}.jpg")
+
+        data = await message.download_media(file=bytes)
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self.index.path_for_hash(digest)
+
+        if existing and os.path.abspath(existing) != os.path.abspath(file_path):
+            self._store_duplicate(existing, file_path, data)
+            self.stats.duplicates += 1
+        else:
+            with open(file_path, "wb") as f:
+                f.write(data)
+            self.stats.downloaded += 1
+            self.stats.bytes += len(data)
+
+        self.index.record(self.channel, message.id, digest, file_path)
+        if self.spool is not None:
+            self.spool.push(self.channel, message.id, file_path)
+
+        done = self.stats.downloaded + self.stats.duplicates
+        if done % PROGRESS_EVERY == 0:
+            logging.info(self.stats.summary(f"{self.channel} (in progress)"))
+
+    @staticmethod
+    def _store_duplicate(existing, file_path, data):
+        """Hard-links a reposted image to its first copy so the bytes are stored once."""
+        if os.path.exists(file_path):
+            return
+        try:
+            os.link(existing, file_path)
+        except OSError:
+            # Cross-device or unsupported filesystem: fall back to a real copy
+            with open(file_path, "wb") as f:
+                f.write(data)
+
+async def download_images(channel_username, client=None, index=None, full=False,
+                          concurrency=DEFAULT_DOWNLOAD_CONCURRENCY, image_root=IMAGE_ROOT, spool=None):
     """
-    Asynchronously downloads all images from a given Telegram channel.
+    Asynchronously downloads all new images from a given Telegram channel.
 
     Parameters:
         channel_username (str): The username or URL of the Telegram channel.
+        client (TelegramClient): An already connected client to reuse. When omitted,
+            a dedicated client is opened for this channel only.
+        index (ImageIndex): Shared download index; loaded from disk if omitted.
+        full (bool): Walk the whole history instead of starting after the last
+            complete pass (already indexed photos are still skipped).
+        concurrency (int): Number of photos downloaded at the same time.
+        image_root (str): Root folder; images go to <image_root>/<channel>/<message_id>.jpg
+        spool (ImageSpool): Receives every saved image for streaming detection.
 
-    Output:
-        Saves images to data/images/channel_username/
+    Raises:
+        FloodWaitError: Propagated so the caller (see scrape_runner) can back off.
+        Exception: Any other error is logged and re-raised, so the caller counts
+            the channel as failed.
     """
-    async with TelegramClient('session_name', api_id, api_hash) as client:
+    if client is None:
+        async with TelegramClient('session_name', api_id, api_hash) as own_client:
+            return await download_images(channel_username, own_client, index, full, concurrency,
+                                         image_root, spool)
+
+    index = index or ImageIndex()
+
+    try:
+        # Get the channel entity
+        channel = await client.get_entity(channel_username)
+        logging.info(f"Connected to channel: {channel_username}")
+
+        media_dir = os.path.join(image_root, channel.username)
+        pool = ImageDownloadPool(channel.username, media_dir, index, concurrency, spool)
+        await pool.start()
+
+        min_id = 0 if full else index.watermark(channel.username)
+        newest_id = 0
         try:
-            # Get the channel entity
-            channel = await client.get_entity(channel_username)
-            logging.info(f"Connected to channel: {channel_username}")
-
-            # Create a directory for storing images
-            media_dir = f"data/images1/{channel.username}/"
-            os.makedirs(media_dir, exist_ok=True)
-            logging.info(f"Created image directory: {media_dir}")
-
-            # Iterate over all messages in the channel
-            async for message in client.iter_messages(channel):
-                if message.photo:
-                    try:
-                        # Generate a unique file name based on message ID
-                        file_path = os.path.join(media_dir, f"{message.id}.jpg")
-                        
-                        # Download the photo
-                        await message.download_media(file=file_path)
-                        logging.info(f"Downloaded image: {file_path}")
-                        print(f"Downloaded: {file_path}")
-                    except Exception as e:
-                        logging.error(f"Failed to download image from message {message.id}: {e}")
-
-        except Exception as e:
-            logging.error(f"Error connecting to channel {channel_username}: {e}")
+            # Only walk photo messages newer than the last complete pass
+            async for message in client.iter_messages(channel, min_id=min_id, filter=InputMessagesFilterPhotos):
+                newest_id = max(newest_id, message.id)
+                await pool.submit(message)
+        finally:
+            stats = await pool.close()
+
+        # Failed photos keep the watermark in place so the next run retries them
+        if stats.failed == 0:
+            index.advance_watermark(channel.username, newest_id)
+            index.save()
+
+    except FloodWaitError:
+        raise
+    except Exception as e:
+        logging.error(f"Error connecting to channel {channel_username}: {e}")
+        raise
+
+def parse_args():
+    from src.scraping.scrape_runner import DEFAULT_CHANNELS
+
+    parser = argparse.ArgumentParser(description="Download new photos from Telegram channels.")
+    parser.add_argument("channels", nargs="*", default=DEFAULT_CHANNELS,
+                        help="Channel usernames to download from (defaults to the medical channels list)")
+    parser.add_argument("--download-concurrency", type=int, default=DEFAULT_DOWNLOAD_CONCURRENCY,
+                        help="Photos downloaded at the same time per channel")
+    parser.add_argument("--full", action="store_true",
+                        help="Walk each channel's whole history (indexed photos are still skipped)")
+    parser.add_argument("--stream-detection", action="store_true",
+                        help="Spool every saved image for the streaming YOLO detector")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    # List of channels to scrape images from
-    channels = [
-        'chemed123',
-       'lobelia4cosmetics',
-        'tikvahpharma'
-    ]
-
-    # Set up event loop and run the downloader
-    loop = asyncio.get_event_loop()
-    for channel in channels:
-        print(f"Downloading images from channel: {channel}")
-        loop.run_until_complete(download_images(channel))
\ No newline at end of file
+    from src.scraping.scrape_runner import run_with_shared_client
+
+    args = parse_args()
+    index = ImageIndex()
+    spool = ImageSpool() if args.stream_detection else None
+
+    async def worker(channel, client):
+        await download_images(channel, client, index=index, full=args.full,
+                              concurrency=args.download_concurrency, spool=spool)
+
+    # Download all channels concurrently over one shared client
+    asyncio.run(run_with_shared_client(args.channels, worker))
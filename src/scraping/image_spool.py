@@ -0,0 +1,116 @@
+# File Path: src/scraping/image_spool.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Hand newly downloaded images to the streaming YOLO detector.
+# Key Features:
+# - One small JSON file per saved image in a spool directory, written
+#   atomically so the detector never reads a half-written entry.
+# - File names start with a nanosecond timestamp, so a directory listing is
+#   already in arrival order.
+# - Works across processes: the scraper and the detector only share the folder.
+# - Entries are removed (acknowledged) only after their detections are committed.
+#   Images that could not be analyzed are re-queued, and moved to failed/ after
+#   MAX_ATTEMPTS tries so an unreadable file cannot block the queue.
+
+import os
+import json
+import time
+import logging
+
+from src.scraping.scrape_state import STATE_DIR
+
+SPOOL_DIR = os.path.join(STATE_DIR, "detection_spool")
+SPOOL_SUFFIX = ".json"
+MAX_ATTEMPTS = 5
+FAILED_DIR = "failed"
+
+class SpoolEntry:
+    """One image waiting for detection."""
+
+    def __init__(self, path, channel, message_id, image_path, saved_at, attempts=0):
+        self.path = path
+        self.channel = channel
+        self.message_id = message_id
+        self.image_path = image_path
+        self.saved_at = saved_at
+        self.attempts = attempts
+
+class ImageSpool:
+    """
+    Directory-backed queue of saved image paths.
+
+    Usage:
+        spool = ImageSpool()
+        spool.push("tikvahpharma", 1234, "data/raw/images/tikvahpharma/1234.jpg")   # producer
+        entries = spool.pending(limit=16)                                          # consumer
+        spool.ack(done)
+        spool.defer(failed)    # retried later, up to MAX_ATTEMPTS
+    """
+
+    def __init__(self, spool_dir=SPOOL_DIR):
+        self.spool_dir = spool_dir
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def push(self, channel, message_id, image_path):
+        self._write(channel, message_id, image_path, time.time(), 0)
+
+    def _write(self, channel, message_id, image_path, saved_at, attempts, spool_dir=None):
+        spool_dir = spool_dir or self.spool_dir
+        name = f"{time.time_ns():020d}-{channel}-{message_id}{SPOOL_SUFFIX}"
+        path = os.path.join(spool_dir, name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "channel": channel,
+                "message_id": message_id,
+                "image_path": image_path,
+                "saved_at": saved_at,
+                "attempts": attempts
+            }, f)
+        os.replace(tmp_path, path)
+
+    def pending(self, limit=None):
+        """Returns the oldest entries first, at most `limit` of them."""
+        names = sorted(name for name in os.listdir(self.spool_dir) if name.endswith(SPOOL_SUFFIX))
+        entries = []
+        for name in names[:limit] if limit else names:
+            path = os.path.join(self.spool_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                entries.append(SpoolEntry(path, data["channel"], data["message_id"],
+                                          data["image_path"], data["saved_at"], data.get("attempts", 0)))
+            except FileNotFoundError:
+                continue
+            except (json.JSONDecodeError, KeyError) as e:
+                logging.error(f"Dropping corrupt spool entry {path}: {e}")
+                os.remove(path)
+        return entries
+
+    def ack(self, entries):
+        for entry in entries:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def defer(self, entries, max_attempts=MAX_ATTEMPTS):
+        """
+        Puts entries that could not be analyzed back at the end of the queue.
+        After `max_attempts` tries an entry is moved to the failed/ folder.
+        """
+        failed_dir = os.path.join(self.spool_dir, FAILED_DIR)
+        for entry in entries:
+            attempts = entry.attempts + 1
+            if attempts >= max_attempts:
+                os.makedirs(failed_dir, exist_ok=True)
+                logging.error(f"Giving up on {entry.image_path} after {attempts} attempts; "
+                              f"moved to {failed_dir}")
+                target_dir = failed_dir
+            else:
+                target_dir = None
+            self._write(entry.channel, entry.message_id, entry.image_path, entry.saved_at, attempts, target_dir)
+            self.ack([entry])
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.spool_dir) if name.endswith(SPOOL_SUFFIX))
@@ -3,18 +3,39 @@
 # Developed by: Addisu Taye Dadi
 # Purpose: Load raw Telegram JSON data into PostgreSQL raw schema.
 # Key Features:
-# - Reads partitioned JSON files from data/raw/
-# - Ensures the raw.telegram_messages table exists
-# - Inserts raw message data into PostgreSQL table: raw.telegram_messages
-# - Uses ON CONFLICT to avoid duplicate inserts
-# - Logs progress and errors
+# - Reads partitioned raw files from data/raw/ (NDJSON, gzip/zstd NDJSON,
+#   and legacy pretty-printed .json arrays)
+# - Ensures the raw.telegram_messages table exists (partitioned by channel,
+#   keyed on (channel, id); see raw_schema.py)
+# - Bulk loads messages with COPY into a temporary staging table, then merges
+#   them into raw.telegram_messages with one set-based insert per batch
+# - Commits per batch so a failure never rolls back the whole run
+# - Load ledger (raw.load_ledger) records each file's size, mtime, checksum and
+#   row count, so unchanged files are skipped without being opened. Files with
+#   malformed lines are ledgered as partial (skipped_lines > 0) and re-read on
+#   every run instead of counting as loaded
+# - --since restricts the scan to date folders on or after a given date
+# - Upserts on (channel, id): re-scraped messages whose JSON changed (edits)
+#   replace the stored copy and get a fresh extracted_at, so incremental dbt
+#   runs pick them up; unchanged duplicates, and copies older than the stored
+#   one (by edit_date), are left untouched
+# - Logs progress, errors and rows per second
 
 import os
+import io
+import csv
 import json
+import time
+import hashlib
 import logging
+import argparse
 import psycopg2
+from datetime import datetime
 from dotenv import load_dotenv
 
+from src.scraping.raw_files import iter_raw_records, is_raw_message_file, channel_from_filename
+from src.scraping.raw_schema import create_schema_and_table, ensure_channel_partition
+
 # Load environment variables
 load_dotenv()
 
@@ -25,98 +46,367 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# PostgreSQL connection
-try:
-    conn = psycopg2.connect(
-        dbname=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        host=os.getenv("DB_HOST"),
-        port=os.getenv("DB_PORT")
-    )
-    cur = conn.cursor()
-    logging.info("Connected to PostgreSQL")
-
-except Exception as e:
-    logging.error(f"Failed to connect to PostgreSQL: {e}")
-    raise
-
-def create_schema_and_table():
-    """Ensures the raw schema and telegram_messages table exist."""
+RAW_DIR = "data/raw/telegram_messages/"
+DEFAULT_BATCH_SIZE = 50000
+
+def get_connection():
+    """Opens the PostgreSQL connection from environment variables."""
     try:
-        # Create schema if not exists
-        cur.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-        # Create table if not exists
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS raw.telegram_messages (
-                id BIGINT PRIMARY KEY,
-                channel TEXT NOT NULL,
-                message_json JSONB NOT NULL,
-                extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        conn.commit()
-        logging.info("Schema and table created or already exist.")
+        conn = psycopg2.connect(
+            dbname=os.getenv("DB_NAME"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            host=os.getenv("DB_HOST"),
+            port=os.getenv("DB_PORT")
+        )
+        logging.info("Connected to PostgreSQL")
+        return conn
     except Exception as e:
-        conn.rollback()
-        logging.error(f"Error creating schema/table: {e}")
+        logging.error(f"Failed to connect to PostgreSQL: {e}")
         raise
 
-try:
-    # Ensure schema and table exist before loading
-    create_schema_and_table()
+UPSERT_LEDGER_SQL = """
+    INSERT INTO raw.load_ledger (file_path, file_size, file_mtime, checksum, row_count, skipped_lines, loaded_at)
+    VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+    ON CONFLICT (file_path) DO UPDATE SET
+        file_size = EXCLUDED.file_size,
+        file_mtime = EXCLUDED.file_mtime,
+        checksum = EXCLUDED.checksum,
+        row_count = EXCLUDED.row_count,
+        skipped_lines = EXCLUDED.skipped_lines,
+        loaded_at = EXCLUDED.loaded_at;
+"""
+
+# A message's version is its Telegram edit_date (never edited: -infinity).
+# Files can be loaded out of order (parallel workers, reloads of old folders),
+# so a copy only replaces the stored one if it is at least as recent.
+UPSERT_MESSAGE_SQL = """
+    ON CONFLICT (channel, id) DO UPDATE SET
+        message_json = EXCLUDED.message_json,
+        extracted_at = EXCLUDED.extracted_at
+    WHERE raw.telegram_messages.message_json IS DISTINCT FROM EXCLUDED.message_json
+      AND COALESCE((EXCLUDED.message_json->>'edit_date')::TIMESTAMPTZ, '-infinity')
+          >= COALESCE((raw.telegram_messages.message_json->>'edit_date')::TIMESTAMPTZ, '-infinity')
+"""
+
+def fetch_ledger(conn):
+    """Returns {file_path: (size, mtime, checksum, skipped_lines)} for every file loaded so far."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT file_path, file_size, file_mtime, checksum, skipped_lines FROM raw.load_ledger;")
+        return {row[0]: (row[1], row[2], row[3], row[4]) for row in cur.fetchall()}
+
+def file_checksum(file_path, chunk_size=1024 * 1024):
+    """Streams a file through sha256."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def check_ledger(ledger, file_path):
+    """
+    Decides whether a file needs loading. A partial load (some lines were
+    skipped as malformed) never counts as loaded, whatever the file's state.
+
+    Returns:
+        (needs_load, size, mtime, checksum): checksum is None when the file was
+        skipped on size + mtime alone (i.e. it was never opened).
+    """
+    stat = os.stat(file_path)
+    entry = ledger.get(file_path)
+
+    partial = bool(entry and entry[3])
+
+    if entry and not partial and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+        return False, stat.st_size, stat.st_mtime, None
 
-    raw_dir = "data/raw/telegram_messages/"
+    checksum = file_checksum(file_path)
+    needs_load = not entry or partial or entry[2] != checksum
+    return needs_load, stat.st_size, stat.st_mtime, checksum
 
-    # Traverse directory and load each JSON file
-    for date_folder in os.listdir(raw_dir):
+def iter_raw_files(raw_dir=RAW_DIR, since=None):
+    """
+    Yields (file_path, channel) for every raw message file under the date folders.
+
+    Parameters:
+        since (str): Optional YYYY-MM-DD; older date folders are not scanned.
+    """
+    for date_folder in sorted(os.listdir(raw_dir)):
+        if since and date_folder < since:
+            continue
         folder_path = os.path.join(raw_dir, date_folder)
-        
+
         if os.path.isdir(folder_path):
             logging.info(f"Processing folder: {folder_path}")
-            
-            for file in os.listdir(folder_path):
-                if file.endswith(".json"):
-                    channel = file.replace(".json", "")
-                    file_path = os.path.join(folder_path, file)
-                    
-                    logging.info(f"Loading file: {file_path}")
-                    
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            messages = json.load(f)
-
-                            for msg in messages:
-                                message_id = msg.get('id')
-                                if not message_id:
-                                    logging.warning(f"Message missing 'id' field in {file_path}")
-                                    continue
-
-                                cur.execute("""
-                                    INSERT INTO raw.telegram_messages (id, channel, message_json)
-                                    VALUES (%s, %s, %s)
-                                    ON CONFLICT (id) DO NOTHING;
-                                """, (
-                                    message_id,
-                                    channel,
-                                    json.dumps(msg)
-                                ))
-
-                            logging.info(f"Loaded {len(messages)} messages from {file}")
-
-                    except json.JSONDecodeError as je:
-                        logging.error(f"JSON decode error in {file_path}: {je}")
-                    except Exception as e:
-                        logging.error(f"Unexpected error loading {file_path}: {e}")
 
+            for file in sorted(os.listdir(folder_path)):
+                if is_raw_message_file(file):
+                    yield os.path.join(folder_path, file), channel_from_filename(file)
+
+class CopyBatchLoader:
+    """
+    Buffers rows and loads them with COPY into a temporary staging table, then
+    merges each batch into raw.telegram_messages with a single INSERT ... SELECT.
+
+    Each batch is committed on its own; a failed batch is rolled back and
+    logged without undoing the batches committed before it.
+
+    Ledger entries are written in the same transaction as the batch holding a
+    file's last rows, so a file is only marked loaded once all of it is committed.
+    Rows from several files may share a batch (see parallel_loader), so failures
+    are tracked per file.
+    """
+
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE, max_buffer_bytes=None):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.max_buffer_bytes = max_buffer_bytes
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.pending = 0
+        self.pending_ledger = []
+        self.batch_files = set()
+        self.failed_files = set()
+
+        self.rows_read = 0
+        self.rows_inserted = 0
+        self.rows_failed = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+        with conn.cursor() as cur:
+            # ON COMMIT DELETE ROWS empties the staging table after every batch
+            cur.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS telegram_messages_staging (
+                    seq BIGSERIAL,
+                    id BIGINT,
+                    channel TEXT,
+                    message_json JSONB
+                ) ON COMMIT DELETE ROWS;
+            """)
+        conn.commit()
+
+    def add(self, message_id, channel, message_json, file_path=None):
+        """Queues one row; flushes automatically when the batch is full."""
+        self.writer.writerow((message_id, channel, message_json))
+        self.batch_files.add(file_path)
+        self.pending += 1
+        self.rows_read += 1
+        if self.pending >= self.batch_size or (
+            self.max_buffer_bytes and self.buffer.tell() >= self.max_buffer_bytes
+        ):
+            self.flush()
+
+    def mark_file_loaded(self, ledger_entry):
+        """
+        Queues a ledger row (path, size, mtime, checksum, rows, skipped_lines) for the next commit,
+        unless part of the file was lost in a failed batch.
+        """
+        if ledger_entry[0] not in self.failed_files:
+            self.pending_ledger.append(ledger_entry)
+
+    def flush(self):
+        """COPYs the buffered rows and merges them into raw.telegram_messages."""
+        if not self.pending and not self.pending_ledger:
+            return
+
+        self.buffer.seek(0)
+        try:
+            inserted = 0
+            with self.conn.cursor() as cur:
+                if self.pending:
+                    cur.copy_expert(
+                        "COPY telegram_messages_staging (id, channel, message_json) FROM STDIN WITH (FORMAT csv)",
+                        self.buffer
+                    )
+                    # A batch can hold the same message twice (lookback re-fetch, or
+                    # several files from parallel workers in arrival order); one
+                    # upsert can't touch a row twice, so keep the latest edit, and
+                    # the copy read last among equal edits
+                    cur.execute("""
+                        INSERT INTO raw.telegram_messages (id, channel, message_json)
+                        SELECT DISTINCT ON (channel, id) id, channel, message_json
+                        FROM telegram_messages_staging
+                        ORDER BY channel, id,
+                                 COALESCE((message_json->>'edit_date')::TIMESTAMPTZ, '-infinity') DESC,
+                                 seq DESC
+                    """ + UPSERT_MESSAGE_SQL)
+                    inserted = cur.rowcount
+                if self.pending_ledger:
+                    cur.executemany(UPSERT_LEDGER_SQL, self.pending_ledger)
+            self.conn.commit()
+            self.rows_inserted += inserted
+            self.batches += 1
+            logging.info(f"Committed batch {self.batches}: {self.pending} rows read, {inserted} new or edited")
+        except Exception as e:
+            self.conn.rollback()
+            self.rows_failed += self.pending
+            self.failed_files |= self.batch_files
+            logging.error(
+                f"Batch of {self.pending} rows failed and was rolled back; "
+                f"{len(self.pending_ledger)} file(s) will be retried next run: {e}"
+            )
+        finally:
+            self.buffer.seek(0)
+            self.buffer.truncate()
+            self.pending = 0
+            self.pending_ledger = []
+            self.batch_files = set()
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (
+            f"Read {self.rows_read} rows, wrote {self.rows_inserted} new or edited, {self.rows_failed} failed "
+            f"in {self.batches} batches over {elapsed:.1f}s ({self.rows_read / elapsed:,.0f} rows/s)"
+        )
+
+def load_file_copy(loader, file_path, channel):
+    """Streams one raw file into the COPY batch loader. Returns (rows queued, malformed lines skipped)."""
+    loaded = 0
+    stats = {"skipped_lines": 0}
+    for msg, message_json in iter_raw_records(file_path, stats):
+        message_id = msg.get('id')
+        if not message_id:
+            logging.warning(f"Message missing 'id' field in {file_path}")
+            continue
+        loader.add(message_id, channel, message_json, file_path)
+        loaded += 1
+    return loaded, stats["skipped_lines"]
+
+def load_file_insert(conn, file_path, channel, ledger_entry):
+    """
+    Legacy row-by-row path: one INSERT per message, committed per file with its
+    ledger row. Returns (rows loaded, malformed lines skipped).
+    """
+    loaded = 0
+    stats = {"skipped_lines": 0}
+    with conn.cursor() as cur:
+        for msg, message_json in iter_raw_records(file_path, stats):
+            message_id = msg.get('id')
+            if not message_id:
+                logging.warning(f"Message missing 'id' field in {file_path}")
+                continue
+
+            cur.execute("""
+                INSERT INTO raw.telegram_messages (id, channel, message_json)
+                VALUES (%s, %s, %s)
+            """ + UPSERT_MESSAGE_SQL, (
+                message_id,
+                channel,
+                message_json
+            ))
+            loaded += 1
+        cur.execute(UPSERT_LEDGER_SQL, ledger_entry[:4] + (loaded, stats["skipped_lines"]))
     conn.commit()
-    logging.info("All data loaded successfully.")
-
-except Exception as e:
-    conn.rollback()
-    logging.error(f"Transaction failed: {e}")
-finally:
-    cur.close()
-    conn.close()
-    print("Raw Telegram messages loaded into PostgreSQL.")
\ No newline at end of file
+    return loaded, stats["skipped_lines"]
+
+def log_file_loaded(file_path, loaded, skipped_lines, verb="Loaded"):
+    name = os.path.basename(file_path)
+    if skipped_lines:
+        logging.warning(f"{verb} {loaded} messages from {name} but skipped {skipped_lines} malformed "
+                        f"line(s); the file is ledgered as partial and will be re-read next run")
+    else:
+        logging.info(f"{verb} {loaded} messages from {name}")
+
+def load_all(conn, raw_dir=RAW_DIR, mode="copy", batch_size=DEFAULT_BATCH_SIZE, since=None, use_ledger=True):
+    """
+    Loads every new or changed raw file under raw_dir using the chosen mode
+    ("copy" or "insert"). Files recorded unchanged in the ledger are skipped.
+    """
+    loader = CopyBatchLoader(conn, batch_size) if mode == "copy" else None
+    ledger = fetch_ledger(conn) if use_ledger else {}
+    started = time.perf_counter()
+    total = 0
+    skipped = 0
+    partial = 0
+
+    for file_path, channel in iter_raw_files(raw_dir, since):
+        try:
+            needs_load, size, mtime, checksum = check_ledger(ledger, file_path)
+            if not needs_load:
+                skipped += 1
+                if checksum is not None:
+                    # Touched but identical content: remember the new mtime only
+                    with conn.cursor() as cur:
+                        cur.execute("UPDATE raw.load_ledger SET file_mtime = %s WHERE file_path = %s;",
+                                    (mtime, file_path))
+                    conn.commit()
+                continue
+
+            logging.info(f"Loading file: {file_path}")
+            ensure_channel_partition(conn, channel)
+            ledger_entry = (file_path, size, mtime, checksum)
+            if loader is not None:
+                loaded, skipped_lines = load_file_copy(loader, file_path, channel)
+                loader.mark_file_loaded(ledger_entry + (loaded, skipped_lines))
+            else:
+                loaded, skipped_lines = load_file_insert(conn, file_path, channel, ledger_entry)
+            total += loaded
+            log_file_loaded(file_path, loaded, skipped_lines)
+            if skipped_lines:
+                partial += 1
+        except json.JSONDecodeError as je:
+            conn.rollback()
+            logging.error(f"JSON decode error in {file_path}: {je}")
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Unexpected error loading {file_path}: {e}")
+
+    if loader is not None:
+        loader.flush()
+        summary = loader.summary()
+    else:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        summary = f"Read {total} rows over {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)"
+
+    summary += f"; skipped {skipped} unchanged file(s); {partial} partial file(s) to re-read"
+    logging.info(summary)
+    print(summary)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load raw Telegram messages into PostgreSQL.")
+    parser.add_argument("--raw-dir", default=RAW_DIR, help="Root folder of the date-partitioned raw files")
+    parser.add_argument("--mode", choices=["copy", "insert"], default="copy",
+                        help="copy: COPY into a staging table and merge per batch; insert: legacy row-by-row")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per committed batch in copy mode")
+    parser.add_argument("--since", type=parse_date,
+                        help="Only scan date folders on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--ignore-ledger", action="store_true",
+                        help="Reload every file even if the ledger says it is unchanged")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parser processes; above 1, files are parsed in parallel and streamed to one COPY writer")
+    parser.add_argument("--max-memory-mb", type=int, default=512,
+                        help="Ceiling for parsed rows held in memory when --workers > 1")
+    return parser.parse_args()
+
+def parse_date(value):
+    """argparse type for YYYY-MM-DD dates (kept as a string to compare with folder names)."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+def main():
+    args = parse_args()
+    conn = get_connection()
+    try:
+        # Ensure schema and table exist before loading
+        create_schema_and_table(conn)
+        if args.workers > 1:
+            from src.scraping.parallel_loader import load_parallel
+
+            load_parallel(conn, args.raw_dir, args.since, not args.ignore_ledger, args.batch_size,
+                          args.workers, args.max_memory_mb)
+        else:
+            load_all(conn, args.raw_dir, args.mode, args.batch_size, args.since, not args.ignore_ledger)
+        logging.info("All data loaded successfully.")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Transaction failed: {e}")
+    finally:
+        conn.close()
+        print("Raw Telegram messages loaded into PostgreSQL.")
+
+if __name__ == "__main__":
+    main()
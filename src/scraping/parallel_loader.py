@@ -0,0 +1,202 @@
+# File Path: src/scraping/parallel_loader.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Parse large raw message files in parallel with bounded memory.
+# Key Features:
+# - Spreads raw files across a pool of worker processes.
+# - Workers parse incrementally (NDJSON line by line, legacy .json arrays via
+#   ijson when installed) and send fixed-size row chunks back.
+# - A single writer in the main process loads the chunks with COPY.
+# - A bounded result queue keeps parsed-but-unwritten data under a memory ceiling.
+# - A worker that dies (OOM kill, segfault) is detected instead of hanging the
+#   loader; the files it did not finish stay out of the ledger and are retried
+#   on the next run.
+
+import os
+import json
+import time
+import queue
+import logging
+import multiprocessing as mp
+
+try:
+    import ijson
+except ImportError:  # streaming of legacy .json arrays is optional
+    ijson = None
+
+from src.scraping.raw_files import iter_raw_records
+from src.scraping.raw_schema import ensure_channel_partition
+from src.scraping.load_data import (
+    RAW_DIR,
+    DEFAULT_BATCH_SIZE,
+    CopyBatchLoader,
+    fetch_ledger,
+    file_checksum,
+    iter_raw_files,
+    log_file_loaded
+)
+
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+DEFAULT_MAX_MEMORY_MB = 512
+# Size of one chunk of parsed rows sent from a worker to the writer
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+# How often the writer checks that workers are still alive
+POLL_SECONDS = 5
+
+def iter_file_records(file_path, stats=None):
+    """
+    Yields (message dict, compact JSON text) pairs without loading the whole file.
+
+    Legacy `.json` arrays are streamed item by item with ijson; without ijson
+    they fall back to a full `json.load`. Malformed NDJSON lines are counted
+    in `stats` (see iter_raw_records).
+    """
+    if file_path.endswith(".json") and ijson is not None:
+        with open(file_path, "rb") as f:
+            for msg in ijson.items(f, "item", use_float=True):
+                yield msg, json.dumps(msg, ensure_ascii=False, separators=(",", ":"))
+        return
+
+    yield from iter_raw_records(file_path, stats)
+
+def parse_worker(tasks, results, chunk_bytes):
+    """
+    Worker process: parses files from `tasks` and puts messages on `results`:
+
+        ("rows", file_path, [(id, channel, json_text), ...])
+        ("done", file_path, (file_path, size, mtime, checksum, row_count, skipped_lines))
+        ("unchanged", file_path, mtime)
+        ("error", file_path, message)
+        ("exit", None, pid)
+    """
+    while True:
+        task = tasks.get()
+        if task is None:
+            results.put(("exit", None, os.getpid()))
+            return
+
+        file_path, channel, size, mtime, known_checksum = task
+        try:
+            checksum = file_checksum(file_path)
+            if checksum == known_checksum:
+                results.put(("unchanged", file_path, mtime))
+                continue
+
+            rows, rows_bytes, count = [], 0, 0
+            stats = {"skipped_lines": 0}
+            for msg, message_json in iter_file_records(file_path, stats):
+                message_id = msg.get('id')
+                if not message_id:
+                    logging.warning(f"Message missing 'id' field in {file_path}")
+                    continue
+
+                rows.append((message_id, channel, message_json))
+                rows_bytes += len(message_json)
+                count += 1
+                if rows_bytes >= chunk_bytes:
+                    results.put(("rows", file_path, rows))
+                    rows, rows_bytes = [], 0
+
+            if rows:
+                results.put(("rows", file_path, rows))
+            results.put(("done", file_path, (file_path, size, mtime, checksum, count, stats["skipped_lines"])))
+        except Exception as e:
+            results.put(("error", file_path, str(e)))
+
+def load_parallel(conn, raw_dir=RAW_DIR, since=None, use_ledger=True, batch_size=DEFAULT_BATCH_SIZE,
+                  workers=DEFAULT_WORKERS, max_memory_mb=DEFAULT_MAX_MEMORY_MB,
+                  chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Loads new or changed raw files using `workers` parser processes and one COPY writer.
+
+    Half of `max_memory_mb` bounds the parsed chunks queued between the workers
+    and the writer; the other half bounds the writer's pending COPY batch.
+    """
+    if ijson is None:
+        logging.warning("ijson is not installed; legacy .json files will be loaded whole")
+
+    budget = max_memory_mb * 1024 * 1024
+    queue_slots = max(1, (budget // 2) // chunk_bytes - workers)
+    loader = CopyBatchLoader(conn, batch_size, max_buffer_bytes=budget // 2)
+    ledger = fetch_ledger(conn) if use_ledger else {}
+    started = time.perf_counter()
+
+    tasks = mp.Queue()
+    results = mp.Queue(maxsize=queue_slots)
+
+    queued = skipped = 0
+    # Files not yet reported done, unchanged or failed by a worker
+    unresolved = set()
+    for file_path, channel in iter_raw_files(raw_dir, since):
+        stat = os.stat(file_path)
+        entry = ledger.get(file_path)
+        # Partial loads (entry[3] skipped lines) are re-read like unloaded files
+        complete = entry and not entry[3]
+        if complete and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+            skipped += 1
+            continue
+        ensure_channel_partition(conn, channel)
+        tasks.put((file_path, channel, stat.st_size, stat.st_mtime, entry[2] if complete else None))
+        queued += 1
+        unresolved.add(file_path)
+
+    workers = max(1, min(workers, queued))
+    for _ in range(workers):
+        tasks.put(None)
+
+    processes = [
+        mp.Process(target=parse_worker, args=(tasks, results, chunk_bytes), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    logging.info(f"Parsing {queued} file(s) with {workers} worker(s), {queue_slots} chunk slot(s)")
+
+    exited = set()
+    while len(exited) < workers:
+        try:
+            kind, file_path, payload = results.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            for process in processes:
+                # exitcode 0 is a clean exit whose "exit" message is still on its way
+                if process.pid not in exited and process.exitcode not in (None, 0):
+                    exited.add(process.pid)
+                    logging.error(f"Parser worker {process.pid} died (exit code {process.exitcode})")
+            continue
+
+        if kind in ("done", "unchanged", "error"):
+            unresolved.discard(file_path)
+
+        if kind == "rows":
+            for message_id, channel, message_json in payload:
+                loader.add(message_id, channel, message_json, file_path)
+        elif kind == "done":
+            loader.mark_file_loaded(payload)
+            log_file_loaded(file_path, payload[4], payload[5], verb="Parsed")
+        elif kind == "unchanged":
+            skipped += 1
+            with conn.cursor() as cur:
+                cur.execute("UPDATE raw.load_ledger SET file_mtime = %s WHERE file_path = %s;",
+                            (payload, file_path))
+            conn.commit()
+        elif kind == "error":
+            loader.failed_files.add(file_path)
+            logging.error(f"Unexpected error loading {file_path}: {payload}")
+        elif kind == "exit":
+            exited.add(payload)
+
+    # Files a dead worker was parsing (or never got to) are not ledgered, so the
+    # next run retries them; rows of theirs already queued are loaded anyway
+    if unresolved:
+        loader.failed_files |= unresolved
+        logging.error(f"{len(unresolved)} file(s) were not fully parsed and will be retried next run: "
+                      f"{sorted(unresolved)}")
+
+    for process in processes:
+        process.join()
+
+    loader.flush()
+    summary = f"{loader.summary()}; skipped {skipped} unchanged file(s); {workers} worker(s)"
+    logging.info(summary)
+    print(summary)
+    return time.perf_counter() - started
@@ -0,0 +1,185 @@
+# File Path: src/scraping/raw_files.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Read and write raw Telegram message files in the data lake.
+# Key Features:
+# - Streams messages to compact NDJSON (one JSON object per line).
+# - Optional gzip or zstd compression and size-based file rotation.
+# - Files are written under a temporary name and renamed when complete,
+#   so the loader never picks up a half-written file.
+# - Reads both the NDJSON format and the legacy pretty-printed .json arrays.
+
+import os
+import io
+import gzip
+import json
+import logging
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {
+    "none": "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+RAW_FILE_SUFFIXES = (".json", ".ndjson", ".ndjson.gz", ".ndjson.zst")
+
+DEFAULT_COMPRESSION = "gzip"
+DEFAULT_ROTATE_BYTES = 64 * 1024 * 1024
+
+def channel_from_filename(file_name):
+    """
+    Returns the channel a raw file belongs to.
+
+    Handles both `channel.json` and `channel.<run>.<part>.ndjson[.gz|.zst]`
+    (Telegram usernames never contain dots).
+    """
+    return os.path.basename(file_name).split(".")[0]
+
+def is_raw_message_file(file_name):
+    """True for completed raw message files in any supported format."""
+    return file_name.endswith(RAW_FILE_SUFFIXES)
+
+def _open_binary_reader(file_path):
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rb")
+    if file_path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is not installed; cannot read {file_path}")
+        return zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+    return open(file_path, "rb")
+
+def iter_raw_lines(file_path):
+    """
+    Yields each message of an NDJSON file as its raw JSON text (no parsing).
+    """
+    with _open_binary_reader(file_path) as raw:
+        for line in io.TextIOWrapper(raw, encoding="utf-8"):
+            line = line.strip()
+            if line:
+                yield line
+
+def iter_raw_messages(file_path):
+    """
+    Yields message dicts from a raw file, whatever its format.
+
+    Legacy `.json` files hold one JSON array and are loaded whole; NDJSON files
+    are streamed line by line so memory stays flat regardless of file size.
+    """
+    if file_path.endswith(".json"):
+        with open(file_path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    for msg, _ in iter_raw_records(file_path):
+        yield msg
+
+def iter_raw_records(file_path, stats=None):
+    """
+    Yields (message dict, compact JSON text) pairs from a raw file.
+
+    NDJSON lines are passed through as-is, so bulk loaders can store the
+    original text without serialising every message a second time.
+
+    Malformed NDJSON lines are logged and skipped; pass a `stats` dict to have
+    them counted in stats["skipped_lines"], so the caller can tell a partial
+    read from a complete one.
+    """
+    if file_path.endswith(".json"):
+        for msg in iter_raw_messages(file_path):
+            yield msg, json.dumps(msg, ensure_ascii=False, separators=(",", ":"))
+        return
+
+    for line_no, line in enumerate(iter_raw_lines(file_path), start=1):
+        try:
+            yield json.loads(line), line
+        except json.JSONDecodeError as e:
+            logging.error(f"Skipping malformed line {line_no} in {file_path}: {e}")
+            if stats is not None:
+                stats["skipped_lines"] = stats.get("skipped_lines", 0) + 1
+
+class NDJSONWriter:
+    """
+    Appends messages to compact NDJSON files as they arrive.
+
+    Files are named `<channel>.<HHMMSS>.<part>.ndjson[.gz|.zst]` inside `dir_path`
+    and rotated once the (compressed) file reaches `max_bytes`.
+
+    Usage:
+        with NDJSONWriter(dir_path, "tikvahpharma") as writer:
+            async for message in client.iter_messages(channel):
+                writer.write(json.loads(message.to_json()))
+    """
+
+    def __init__(self, dir_path, channel, compression=DEFAULT_COMPRESSION, max_bytes=DEFAULT_ROTATE_BYTES):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {list(COMPRESSION_SUFFIXES)}")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression requested but the zstandard package is not installed")
+
+        self.dir_path = dir_path
+        self.channel = channel
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.run_stamp = datetime.now().strftime('%H%M%S')
+
+        self.part = 0
+        self.records = 0
+        self.files = []
+
+        self._raw = None
+        self._stream = None
+        self._tmp_path = None
+        self._final_path = None
+
+    def _open_part(self):
+        os.makedirs(self.dir_path, exist_ok=True)
+        self.part += 1
+        file_name = f"{self.channel}.{self.run_stamp}.{self.part:03d}.ndjson{COMPRESSION_SUFFIXES[self.compression]}"
+        self._final_path = os.path.join(self.dir_path, file_name)
+        self._tmp_path = f"{self._final_path}.part"
+
+        self._raw = open(self._tmp_path, "wb")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def _close_part(self):
+        if self._stream is None:
+            return
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+        os.replace(self._tmp_path, self._final_path)
+        self.files.append(self._final_path)
+        self._raw = self._stream = None
+
+    def write(self, record):
+        """Writes one message as a single compact JSON line."""
+        if self._stream is None:
+            self._open_part()
+
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._stream.write(line.encode("utf-8"))
+        self.records += 1
+
+        if self._raw.tell() >= self.max_bytes:
+            self._close_part()
+
+    def close(self):
+        """Finalises the current file (if any). Safe to call more than once."""
+        self._close_part()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
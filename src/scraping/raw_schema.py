@@ -0,0 +1,163 @@
+# File Path: src/scraping/raw_schema.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Own the DDL of the raw schema used by the loaders.
+# Key Features:
+# - raw.telegram_messages keyed on (channel, id): Telegram message ids are only
+#   unique within a channel.
+# - The table is LIST-partitioned by channel (one partition per channel plus a
+#   default partition), so per-channel queries prune to a single partition.
+# - extracted_at is indexed on the partitioned parent (and so on every
+#   partition), so incremental dbt runs read only newly loaded rows.
+# - Migrates the legacy unpartitioned `id BIGINT PRIMARY KEY` table in place.
+# - raw.load_ledger for file-level incremental loads, including how many
+#   malformed lines each load skipped.
+
+import re
+import logging
+from psycopg2 import sql
+
+TELEGRAM_MESSAGES_DDL = """
+    CREATE TABLE IF NOT EXISTS raw.telegram_messages (
+        id BIGINT NOT NULL,
+        channel TEXT NOT NULL,
+        message_json JSONB NOT NULL,
+        extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (channel, id)
+    ) PARTITION BY LIST (channel);
+"""
+
+# Created on the parent: existing partitions get a matching index, and
+# partitions created later (PARTITION OF) inherit it automatically
+EXTRACTED_AT_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS telegram_messages_extracted_at_idx
+    ON raw.telegram_messages (extracted_at);
+"""
+
+DEFAULT_PARTITION_DDL = """
+    CREATE TABLE IF NOT EXISTS raw.telegram_messages_default
+    PARTITION OF raw.telegram_messages DEFAULT;
+"""
+
+LOAD_LEDGER_DDL = """
+    CREATE TABLE IF NOT EXISTS raw.load_ledger (
+        file_path TEXT PRIMARY KEY,
+        file_size BIGINT NOT NULL,
+        file_mtime DOUBLE PRECISION NOT NULL,
+        checksum TEXT NOT NULL,
+        row_count BIGINT NOT NULL,
+        skipped_lines BIGINT NOT NULL DEFAULT 0,
+        loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+# Ledgers created before malformed lines were counted
+LOAD_LEDGER_SKIPPED_LINES_DDL = """
+    ALTER TABLE raw.load_ledger ADD COLUMN IF NOT EXISTS skipped_lines BIGINT NOT NULL DEFAULT 0;
+"""
+
+# Channels whose partition is known to exist in this process
+_known_partitions = set()
+
+def partition_name(channel):
+    """Partition table name for a channel, e.g. telegram_messages_tikvahpharma."""
+    return "telegram_messages_" + re.sub(r"[^a-z0-9_]", "_", channel.lower())
+
+def table_kind(cur, schema, table):
+    """Returns pg_class.relkind ('r' table, 'p' partitioned table) or None if missing."""
+    cur.execute("""
+        SELECT c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = %s;
+    """, (schema, table))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+def _create_partition(cur, channel):
+    cur.execute(sql.SQL(
+        "CREATE TABLE IF NOT EXISTS raw.{} PARTITION OF raw.telegram_messages FOR VALUES IN ({});"
+    ).format(sql.Identifier(partition_name(channel)), sql.Literal(channel)))
+
+def ensure_channel_partition(conn, channel):
+    """Creates the channel's partition on first use (committed immediately)."""
+    if channel in _known_partitions:
+        return
+    with conn.cursor() as cur:
+        # Cheap no-op once present; covers tables created before the index existed
+        cur.execute(EXTRACTED_AT_INDEX_DDL)
+        _create_partition(cur, channel)
+    conn.commit()
+    _known_partitions.add(channel)
+
+def migrate_legacy_table(conn):
+    """
+    Converts a legacy `id BIGINT PRIMARY KEY` table into the partitioned
+    (channel, id) layout, in a single transaction.
+
+    Rows that the old key silently dropped (same id in another channel) cannot be
+    recovered from the table, so the load ledger is cleared: the next load
+    re-reads every raw file and fills them in.
+    """
+    with conn.cursor() as cur:
+        if table_kind(cur, "raw", "telegram_messages") != "r":
+            return False
+
+        logging.info("Migrating raw.telegram_messages to the partitioned (channel, id) layout...")
+        cur.execute("ALTER TABLE raw.telegram_messages RENAME TO telegram_messages_legacy;")
+        cur.execute("""
+            ALTER TABLE raw.telegram_messages_legacy
+            RENAME CONSTRAINT telegram_messages_pkey TO telegram_messages_legacy_pkey;
+        """)
+        cur.execute(TELEGRAM_MESSAGES_DDL)
+        cur.execute(EXTRACTED_AT_INDEX_DDL)
+        cur.execute(DEFAULT_PARTITION_DDL)
+
+        cur.execute("SELECT DISTINCT channel FROM raw.telegram_messages_legacy;")
+        channels = [row[0] for row in cur.fetchall()]
+        for channel in channels:
+            _create_partition(cur, channel)
+
+        cur.execute("""
+            INSERT INTO raw.telegram_messages (id, channel, message_json, extracted_at)
+            SELECT id, channel, message_json, extracted_at
+            FROM raw.telegram_messages_legacy
+            ON CONFLICT (channel, id) DO NOTHING;
+        """)
+        migrated = cur.rowcount
+
+        # Views built on the old table (dbt staging) are recreated by the next `dbt run`
+        cur.execute("DROP TABLE raw.telegram_messages_legacy CASCADE;")
+        cur.execute(LOAD_LEDGER_DDL)
+        cur.execute("DELETE FROM raw.load_ledger;")
+    conn.commit()
+    _known_partitions.update(channels)
+
+    logging.info(f"Migrated {migrated} rows into {len(channels)} channel partitions; load ledger reset.")
+    return True
+
+def create_schema_and_table(conn):
+    """Ensures the raw schema, the partitioned telegram_messages table and the ledger exist."""
+    try:
+        with conn.cursor() as cur:
+            # Create schema if not exists
+            cur.execute("CREATE SCHEMA IF NOT EXISTS raw;")
+        conn.commit()
+
+        migrate_legacy_table(conn)
+
+        with conn.cursor() as cur:
+            cur.execute(TELEGRAM_MESSAGES_DDL)
+            cur.execute(EXTRACTED_AT_INDEX_DDL)
+            cur.execute(DEFAULT_PARTITION_DDL)
+
+            # One row per raw file that has been loaded; skipped_lines > 0 marks
+            # a partial load that the loaders re-read on every run
+            cur.execute(LOAD_LEDGER_DDL)
+            cur.execute(LOAD_LEDGER_SKIPPED_LINES_DDL)
+        conn.commit()
+        logging.info("Schema and tables created or already exist.")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Error creating schema/table: {e}")
+        raise
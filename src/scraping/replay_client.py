@@ -0,0 +1,235 @@
+# File Path: src/scraping/replay_client.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Offline stand-in for the part of TelegramClient the scrapers use.
+# Key Features:
+# - Implements get_entity, iter_messages (min_id, offset_date, reverse, filter,
+#   limit), message.to_json and message.download_media.
+# - Replays recorded raw files from the data lake or synthetic messages/images.
+# - Configurable per-request latency, download bandwidth and rate limits; can
+#   answer over-limit requests with FloodWaitError like Telegram does.
+# - Lets the scrapers be benchmarked in CI without credentials or network.
+
+import os
+import json
+import time
+import random
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from telethon.errors import FloodWaitError
+
+from src.scraping.raw_files import iter_raw_messages, is_raw_message_file, channel_from_filename
+
+# Telethon fetches history in pages of 100 messages per request
+PAGE_SIZE = 100
+
+class ReplayPhoto:
+    """Marker object standing in for telethon.tl.types.Photo."""
+
+    def __init__(self, data):
+        self.data = data
+
+class ReplayEntity:
+    def __init__(self, username, entity_id):
+        self.username = username
+        self.id = entity_id
+
+class ReplayMessage:
+    """A message with the attributes and methods the scrapers touch."""
+
+    def __init__(self, client, message_id, date, text, photo=None, raw=None):
+        self._client = client
+        self.id = message_id
+        self.date = date
+        self.message = text
+        self.photo = photo
+        self._raw = raw
+
+    def to_json(self):
+        if self._raw is not None:
+            return json.dumps(self._raw)
+        return json.dumps({
+            "_": "Message",
+            "id": self.id,
+            "date": self.date.isoformat(),
+            "message": self.message,
+            "media": {"_": "MessageMediaPhoto"} if self.photo else None,
+        })
+
+    async def download_media(self, file=None):
+        """Returns bytes when `file is bytes`, otherwise writes to the path and returns it."""
+        if not self.photo:
+            return None
+        await self._client._request(len(self.photo.data))
+        if file is bytes:
+            return self.photo.data
+        with open(file, "wb") as f:
+            f.write(self.photo.data)
+        return file
+
+class ReplayTelegramClient:
+    """
+    Async context manager mimicking TelegramClient for replayed channels.
+
+    Parameters:
+        channels (dict): username -> list of message specs
+            {"id", "date" (datetime), "text", "photo" (bytes or None), "raw" (dict or None)}.
+        latency (float): Seconds added to every request.
+        requests_per_second (float): Token-bucket rate limit; None disables it.
+        burst (int): Token-bucket capacity.
+        raise_flood_wait (bool): Over-limit requests raise FloodWaitError instead of waiting.
+        bandwidth_bytes_per_second (float): Simulated download bandwidth; None is unlimited.
+    """
+
+    def __init__(self, channels, latency=0.0, requests_per_second=None, burst=10,
+                 raise_flood_wait=False, bandwidth_bytes_per_second=None):
+        self.latency = latency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.raise_flood_wait = raise_flood_wait
+        self.bandwidth = bandwidth_bytes_per_second
+        self.flood_sleep_threshold = 60
+
+        self.requests = 0
+        self.flood_waits = 0
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        self._entities = {}
+        self._messages = {}
+        for entity_id, (username, specs) in enumerate(channels.items(), start=1):
+            self._entities[username] = ReplayEntity(username, entity_id)
+            self._messages[username] = sorted(
+                (self._build_message(spec) for spec in specs), key=lambda m: m.id, reverse=True
+            )
+
+    def _build_message(self, spec):
+        photo = ReplayPhoto(spec["photo"]) if spec.get("photo") else None
+        return ReplayMessage(self, spec["id"], spec["date"], spec.get("text"), photo, spec.get("raw"))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def _request(self, payload_bytes=0):
+        """Charges one API request against the rate limit and simulated latency."""
+        self.requests += 1
+        if self.requests_per_second:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.requests_per_second)
+                self._last_refill = now
+                if self._tokens < 1:
+                    wait = (1 - self._tokens) / self.requests_per_second
+                    if self.raise_flood_wait:
+                        self.flood_waits += 1
+                        raise FloodWaitError(request=None, capture=max(1, int(wait + 0.999)))
+                    await asyncio.sleep(wait)
+                    self._tokens = 1
+                    self._last_refill = time.monotonic()
+                self._tokens -= 1
+
+        delay = self.latency
+        if self.bandwidth and payload_bytes:
+            delay += payload_bytes / self.bandwidth
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def get_entity(self, entity):
+        await self._request()
+        username = str(entity).rstrip("/").split("/")[-1].lstrip("@")
+        if username not in self._entities:
+            raise ValueError(f'No user has "{entity}" as username')
+        return self._entities[username]
+
+    async def iter_messages(self, entity, limit=None, offset_date=None, min_id=0, reverse=False, filter=None):
+        """
+        Yields messages newest first (oldest first with reverse=True), one
+        simulated request per page of 100. Any `filter` is treated as
+        InputMessagesFilterPhotos, the only filter the scrapers use.
+        """
+        messages = self._messages[entity.username]
+        selected = []
+        for message in messages:
+            if message.id <= min_id:
+                continue
+            if filter is not None and not message.photo:
+                continue
+            if offset_date is not None:
+                # Telethon: newer than offset_date when reversed, older otherwise
+                if reverse and message.date <= offset_date:
+                    continue
+                if not reverse and message.date >= offset_date:
+                    continue
+            selected.append(message)
+
+        if reverse:
+            selected.reverse()
+        if limit is not None:
+            selected = selected[:limit]
+
+        for index, message in enumerate(selected):
+            if index % PAGE_SIZE == 0:
+                await self._request()
+            yield message
+
+def synthetic_channels(channel_count=3, messages_per_channel=1000, photo_ratio=0.3,
+                       image_bytes=50 * 1024, duplicate_ratio=0.1, seed=42):
+    """
+    Generates channel specs for ReplayTelegramClient.
+
+    `duplicate_ratio` of the photos reuse an earlier image to exercise dedup.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    channels = {}
+    for c in range(channel_count):
+        specs, images = [], []
+        for i in range(1, messages_per_channel + 1):
+            photo = None
+            if rng.random() < photo_ratio:
+                if images and rng.random() < duplicate_ratio:
+                    photo = rng.choice(images)
+                else:
+                    photo = rng.randbytes(image_bytes)
+                    images.append(photo)
+            specs.append({
+                "id": i,
+                "date": start + timedelta(minutes=i),
+                "text": f"Paracetamol 500mg price update #{i}",
+                "photo": photo,
+            })
+        channels[f"channel{c}"] = specs
+    return channels
+
+def recorded_channels(raw_dir="data/raw/telegram_messages", image_dir="data/raw/images"):
+    """
+    Builds channel specs from the data lake: raw message files plus any images
+    saved under <image_dir>/<channel>/<message_id>.jpg.
+    """
+    channels = {}
+    for root, _, files in os.walk(raw_dir):
+        for file in files:
+            if not is_raw_message_file(file):
+                continue
+            channel = channel_from_filename(file)
+            for raw in iter_raw_messages(os.path.join(root, file)):
+                if not raw.get("id") or not raw.get("date"):
+                    continue
+                image_path = os.path.join(image_dir, channel, f"{raw['id']}.jpg")
+                photo = None
+                if os.path.exists(image_path):
+                    with open(image_path, "rb") as f:
+                        photo = f.read()
+                channels.setdefault(channel, {})[raw["id"]] = {
+                    "id": raw["id"],
+                    "date": datetime.fromisoformat(raw["date"]),
+                    "text": raw.get("message"),
+                    "photo": photo,
+                    "raw": raw,
+                }
+    return {channel: list(by_id.values()) for channel, by_id in channels.items()}
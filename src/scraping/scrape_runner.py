@@ -0,0 +1,180 @@
+# File Path: src/scraping/scrape_runner.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Scrape many Telegram channels concurrently over one shared client.
+# Key Features:
+# - Opens a single authenticated TelegramClient for the whole run.
+# - Scrapes channels concurrently with a configurable concurrency limit.
+# - Backs off and retries a channel when Telegram answers with FloodWait.
+# - Logs per-channel and total wall-clock timings.
+
+from telethon.sync import TelegramClient
+from telethon.errors import FloodWaitError
+import os
+import time
+import random
+import logging
+import argparse
+import asyncio
+from dotenv import load_dotenv
+
+from src.scraping.scrape_state import CursorStore
+from src.scraping.telegram_scraper import DEFAULT_CHANNELS, scrape_channel
+from src.scraping.raw_files import COMPRESSION_SUFFIXES, DEFAULT_COMPRESSION, DEFAULT_ROTATE_BYTES
+from src.scraping.image_downloader import ImageIndex, DEFAULT_DOWNLOAD_CONCURRENCY
+from src.scraping.image_spool import ImageSpool
+
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    filename='scraping.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Load credentials
+api_id = os.getenv("TELEGRAM_API_ID")
+api_hash = os.getenv("TELEGRAM_API_HASH")
+
+DEFAULT_CONCURRENCY = 5
+DEFAULT_MAX_RETRIES = 3
+# FloodWaits shorter than this are slept through by Telethon itself
+DEFAULT_FLOOD_SLEEP_THRESHOLD = 60
+# Give up on a channel rather than wait longer than this for one FloodWait
+MAX_FLOOD_WAIT_SECONDS = 15 * 60
+
+def create_client():
+    """Creates the shared Telegram client (one session for the whole run)."""
+    return TelegramClient('session_name', api_id, api_hash)
+
+async def run_channel(channel, worker, client, semaphore, max_retries=DEFAULT_MAX_RETRIES, backoff_base=2.0):
+    """
+    Runs `worker(channel, client)` under the concurrency semaphore, retrying
+    with backoff when Telegram raises a FloodWaitError. Any other error (unknown
+    channel, lost connection) fails the channel without a retry.
+
+    Returns:
+        bool: True if the channel finished, False if it failed or was abandoned.
+    """
+    async with semaphore:
+        for attempt in range(max_retries + 1):
+            start = time.perf_counter()
+            try:
+                await worker(channel, client)
+                logging.info(f"Finished {channel} in {time.perf_counter() - start:.1f}s")
+                return True
+            except FloodWaitError as e:
+                if attempt == max_retries or e.seconds > MAX_FLOOD_WAIT_SECONDS:
+                    logging.error(f"Giving up on {channel} after FloodWait of {e.seconds}s (attempt {attempt + 1})")
+                    return False
+
+                delay = e.seconds + backoff_base * (2 ** attempt) + random.uniform(0, 1)
+                logging.warning(f"FloodWait on {channel}: sleeping {delay:.1f}s before retry {attempt + 1}/{max_retries}")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logging.error(f"Failed {channel} after {time.perf_counter() - start:.1f}s: {e}")
+                return False
+    return False
+
+async def run_with_shared_client(channels, worker, concurrency=DEFAULT_CONCURRENCY,
+                                 max_retries=DEFAULT_MAX_RETRIES,
+                                 flood_sleep_threshold=DEFAULT_FLOOD_SLEEP_THRESHOLD,
+                                 client_factory=create_client):
+    """
+    Opens one client and runs `worker(channel, client)` for every channel concurrently.
+
+    Parameters:
+        channels (list[str]): Channel usernames or URLs.
+        worker (coroutine function): Called as `await worker(channel, client)`.
+        concurrency (int): Maximum number of channels processed at the same time.
+        max_retries (int): FloodWait retries per channel.
+        flood_sleep_threshold (int): FloodWaits up to this many seconds are handled by Telethon.
+        client_factory (callable): Returns an (unstarted) client usable with `async with`.
+
+    Returns:
+        dict: channel -> True/False (finished, or failed/abandoned).
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async with client_factory() as client:
+        client.flood_sleep_threshold = flood_sleep_threshold
+        outcomes = await asyncio.gather(*(
+            run_channel(channel, worker, client, semaphore, max_retries)
+            for channel in channels
+        ))
+
+    results = dict(zip(channels, outcomes))
+    failed = [channel for channel, ok in results.items() if not ok]
+    logging.info(
+        f"Processed {len(channels)} channels in {time.perf_counter() - start:.1f}s "
+        f"(concurrency={concurrency}, failed={failed})"
+    )
+    return results
+
+async def scrape_all(channels=DEFAULT_CHANNELS, concurrency=DEFAULT_CONCURRENCY, full=False,
+                     lookback_hours=0, images=False, max_retries=DEFAULT_MAX_RETRIES,
+                     compression=DEFAULT_COMPRESSION, rotate_bytes=DEFAULT_ROTATE_BYTES,
+                     download_concurrency=DEFAULT_DOWNLOAD_CONCURRENCY, stream_detection=False):
+    """
+    Scrapes messages (and optionally images) for all channels over one shared client.
+
+    With `images=True` each channel is walked once: messages are streamed to the
+    raw lake while their photos are downloaded to data/raw/images/<channel>/.
+    With `stream_detection=True` every saved photo is also spooled for the
+    streaming YOLO detector (src/yolo/stream_detector.py).
+    """
+    # One cursor store and image index shared by all channels, so concurrent
+    # channels never overwrite each other's state on save
+    cursor_store = CursorStore()
+    image_index = ImageIndex() if images else None
+    spool = ImageSpool() if images and stream_detection else None
+
+    async def worker(channel, client):
+        await scrape_channel(channel, full=full, lookback_hours=lookback_hours,
+                             cursor_store=cursor_store, client=client,
+                             compression=compression, rotate_bytes=rotate_bytes,
+                             image_index=image_index, download_concurrency=download_concurrency,
+                             spool=spool)
+
+    return await run_with_shared_client(channels, worker, concurrency=concurrency, max_retries=max_retries)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape many Telegram channels concurrently over one client.")
+    parser.add_argument("channels", nargs="*", default=DEFAULT_CHANNELS,
+                        help="Channel usernames to scrape (defaults to the medical channels list)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum number of channels scraped at the same time")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help="FloodWait retries per channel")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore stored cursors and backfill each channel's whole history")
+    parser.add_argument("--lookback-hours", type=int, default=0,
+                        help="Re-fetch messages posted this many hours before the cursor to pick up edits")
+    parser.add_argument("--images", action="store_true",
+                        help="Also download each channel's photos in the same pass over its history")
+    parser.add_argument("--download-concurrency", type=int, default=DEFAULT_DOWNLOAD_CONCURRENCY,
+                        help="Photos downloaded at the same time per channel")
+    parser.add_argument("--stream-detection", action="store_true",
+                        help="With --images, spool every saved photo for the streaming YOLO detector")
+    parser.add_argument("--compression", choices=list(COMPRESSION_SUFFIXES), default=DEFAULT_COMPRESSION,
+                        help="Compression for the NDJSON output files")
+    parser.add_argument("--rotate-mb", type=int, default=DEFAULT_ROTATE_BYTES // (1024 * 1024),
+                        help="Start a new output file once the current one reaches this many MB")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(scrape_all(
+        args.channels,
+        concurrency=args.concurrency,
+        full=args.full,
+        lookback_hours=args.lookback_hours,
+        images=args.images,
+        max_retries=args.max_retries,
+        compression=args.compression,
+        rotate_bytes=args.rotate_mb * 1024 * 1024,
+        download_concurrency=args.download_concurrency,
+        stream_detection=args.stream_detection
+    ))
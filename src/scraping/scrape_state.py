@@ -0,0 +1,91 @@
+# File Path: src/scraping/scrape_state.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Persist scraper state (per-channel cursors) between runs.
+# Key Features:
+# - Stores the last scraped message id and date for each channel.
+# - Writes state atomically so a crash never leaves a half-written file.
+# - Shared by the scrapers to support incremental runs.
+
+import os
+import json
+import logging
+from datetime import datetime
+
+# Default location for durable scraper state
+STATE_DIR = "data/state"
+CURSOR_FILE = os.path.join(STATE_DIR, "scrape_cursors.json")
+
+
+def load_state(path, default=None):
+    """
+    Loads a JSON state file, returning `default` if it does not exist yet.
+
+    Parameters:
+        path (str): Path to the state file.
+        default: Value returned when the file is missing or unreadable.
+    """
+    if not os.path.exists(path):
+        return {} if default is None else default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        logging.error(f"Corrupt state file {path}, starting fresh: {e}")
+        return {} if default is None else default
+
+
+def save_state(path, data):
+    """
+    Atomically writes a JSON state file (write to temp file, then rename).
+
+    Parameters:
+        path (str): Path to the state file.
+        data: JSON-serialisable state.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CursorStore:
+    """
+    Durable per-channel high-water marks for incremental scraping.
+
+    Each channel maps to {"last_message_id": int, "last_message_date": ISO str}.
+    """
+
+    def __init__(self, path=CURSOR_FILE):
+        self.path = path
+        self.cursors = load_state(path)
+
+    def get(self, channel):
+        """Returns the cursor for a channel, or None if it was never scraped."""
+        return self.cursors.get(channel)
+
+    def get_last_date(self, channel):
+        """Returns the last scraped message date for a channel as a datetime, or None."""
+        cursor = self.get(channel)
+        if not cursor or not cursor.get("last_message_date"):
+            return None
+        return datetime.fromisoformat(cursor["last_message_date"])
+
+    def advance(self, channel, message_id, message_date):
+        """
+        Moves a channel's cursor forward. Older ids (e.g. re-fetched during a
+        lookback window) never move the cursor backwards.
+        """
+        cursor = self.cursors.get(channel)
+        if cursor and cursor.get("last_message_id", 0) >= message_id:
+            return
+        self.cursors[channel] = {
+            "last_message_id": message_id,
+            "last_message_date": message_date.isoformat() if message_date else None,
+        }
+
+    def save(self):
+        save_state(self.path, self.cursors)
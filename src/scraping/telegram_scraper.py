@@ -5,16 +5,36 @@
 # Key Features:
 # - Scrapes messages and images from specified Ethiopian medical channels.
 # - Saves raw JSON in structured partitioned directories.
+# - Streams messages to compact, compressed NDJSON as they arrive (flat memory).
 # - Implements logging for error tracking and audit trails.
+# - Incremental mode: only fetches messages newer than the per-channel cursor.
+# - Optional lookback window to re-fetch recent messages and pick up edits.
+# - Optional single-pass mode that queues photo downloads while messages stream,
+#   storing images under data/raw/images/<channel>/ for the YOLO stage.
 
 from telethon.sync import TelegramClient
-from datetime import datetime
+from telethon.errors import FloodWaitError
+from datetime import datetime, timedelta
 import os
 import json
 import logging
+import argparse
 from dotenv import load_dotenv
 import asyncio
 
+from src.scraping.scrape_state import CursorStore
+from src.scraping.raw_files import (
+    NDJSONWriter,
+    COMPRESSION_SUFFIXES,
+    DEFAULT_COMPRESSION,
+    DEFAULT_ROTATE_BYTES
+)
+from src.scraping.image_downloader import (
+    ImageDownloadPool,
+    IMAGE_ROOT,
+    DEFAULT_DOWNLOAD_CONCURRENCY
+)
+
 load_dotenv()
 
 # Configure logging
@@ -24,34 +44,169 @@ logging.basicConfig(filename='scraping.log', level=logging.INFO)
 api_id = os.getenv("TELEGRAM_API_ID")
 api_hash = os.getenv("TELEGRAM_API_HASH")
 
-async def scrape_channel(channel_url):
-    async with TelegramClient('session_name', api_id, api_hash) as client:
+DEFAULT_CHANNELS = [
+    'chemed123',
+    'lobelia4cosmetics',
+    'tikvahpharma'
+]
+
+def build_iter_kwargs(cursor_store, channel_name, full=False, lookback_hours=0):
+    """
+    Builds the `iter_messages` arguments for an incremental or full scrape.
+
+    - No cursor or `full=True`: walk the whole history.
+    - Cursor without lookback: only messages with id > last_message_id (`min_id`).
+    - Cursor with lookback: every message newer than (last date - lookback),
+      oldest first, so recently edited messages are captured again.
+    """
+    if full:
+        return {}
+
+    cursor = cursor_store.get(channel_name)
+    if not cursor:
+        return {}
+
+    if lookback_hours:
+        last_date = cursor_store.get_last_date(channel_name)
+        if last_date is not None:
+            return {
+                "offset_date": last_date - timedelta(hours=lookback_hours),
+                "reverse": True
+            }
+
+    return {"min_id": cursor["last_message_id"]}
+
+def pass_reaches_watermark(iter_kwargs, first_id, watermark):
+    """
+    True when a scrape pass started at or below the image watermark, i.e. it
+    saw every message between the watermark and its newest message.
+
+    - Full pass (no kwargs): starts at the beginning of the channel.
+    - `min_id` pass: starts right after min_id.
+    - Lookback pass: starts at the oldest message it saw (`first_id`).
+    """
+    if not iter_kwargs:
+        return True
+    if "min_id" in iter_kwargs:
+        return iter_kwargs["min_id"] <= watermark
+    return first_id is not None and first_id <= watermark
+
+async def scrape_channel(channel_url, full=False, lookback_hours=0, cursor_store=None, client=None,
+                         compression=DEFAULT_COMPRESSION, rotate_bytes=DEFAULT_ROTATE_BYTES,
+                         image_index=None, download_concurrency=DEFAULT_DOWNLOAD_CONCURRENCY, spool=None):
+    """
+    Scrapes a Telegram channel into
+    data/raw/telegram_messages/<today>/<channel>.<HHMMSS>.<part>.ndjson[.gz|.zst].
+
+    Messages are written one per line as they arrive from `iter_messages`,
+    so memory use does not grow with the size of the channel. When an
+    `image_index` is given, photos are queued for download in the same pass
+    and saved to data/raw/images/<channel>/<message_id>.jpg.
+
+    Parameters:
+        channel_url (str): The username or URL of the Telegram channel.
+        full (bool): Ignore the stored cursor and backfill the whole history.
+        lookback_hours (int): Re-fetch messages this many hours before the cursor.
+        cursor_store (CursorStore): Shared cursor store; loaded from disk if omitted.
+        client (TelegramClient): An already connected client to reuse. When omitted,
+            a dedicated client is opened for this channel only.
+        compression (str): "gzip", "zstd" or "none".
+        rotate_bytes (int): Start a new file once the current one reaches this size.
+        image_index (ImageIndex): Enables single-pass photo download when given.
+        download_concurrency (int): Photos downloaded at the same time.
+        spool (ImageSpool): Receives every saved image for streaming detection.
+
+    Raises:
+        FloodWaitError: Propagated so the caller (see scrape_runner) can back off.
+        Exception: Any other error is logged and re-raised, so the caller counts
+            the channel as failed.
+    """
+    cursor_store = cursor_store or CursorStore()
+
+    if client is None:
+        async with TelegramClient('session_name', api_id, api_hash) as own_client:
+            return await scrape_channel(channel_url, full, lookback_hours, cursor_store, own_client,
+                                        compression, rotate_bytes, image_index, download_concurrency, spool)
+
+    try:
+        channel = await client.get_entity(channel_url)
+        iter_kwargs = build_iter_kwargs(cursor_store, channel.username, full, lookback_hours)
+        last_id, last_date = 0, None
+        first_id = None
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        dir_path = f"data/raw/telegram_messages/{today}"
+
+        pool = None
+        if image_index is not None:
+            pool = ImageDownloadPool(channel.username, os.path.join(IMAGE_ROOT, channel.username),
+                                     image_index, download_concurrency, spool)
+            await pool.start()
+
         try:
-            channel = await client.get_entity(channel_url)
-            messages = []
+            with NDJSONWriter(dir_path, channel.username, compression, rotate_bytes) as writer:
+                async for message in client.iter_messages(channel, **iter_kwargs):
+                    writer.write(json.loads(message.to_json()))
+                    if pool is not None:
+                        await pool.submit(message)
+                    if message.id > last_id:
+                        last_id, last_date = message.id, message.date
+                    if first_id is None or message.id < first_id:
+                        first_id = message.id
+        finally:
+            if pool is not None:
+                image_stats = await pool.close()
 
-            async for message in client.iter_messages(channel):
-                messages.append(json.loads(message.to_json()))
+        # Only a pass that started at or below the watermark covered every photo up
+        # to last_id; an incremental pass past an older watermark left a gap that
+        # standalone downloads must still walk
+        if pool is not None and image_stats.failed == 0 and pass_reaches_watermark(
+                iter_kwargs, first_id, image_index.watermark(channel.username)):
+            image_index.advance_watermark(channel.username, last_id)
+            image_index.save()
 
-            today = datetime.now().strftime('%Y-%m-%d')
-            dir_path = f"data/raw/telegram_messages/{today}"
-            os.makedirs(dir_path, exist_ok=True)
-            file_path = f"{dir_path}/{channel.username}.json"
+        if not writer.records:
+            logging.info(f"No new messages in {channel_url}")
+            return
 
-            with open(file_path, 'w') as f:
-                json.dump(messages, f, indent=2)
+        # Only advance the cursor once the messages are safely on disk
+        cursor_store.advance(channel.username, last_id, last_date)
+        cursor_store.save()
 
-            logging.info(f"Scraped {len(messages)} messages from {channel_url}")
-        except Exception as e:
-            logging.error(f"Error scraping {channel_url}: {e}")
+        mode = "full" if full else "incremental"
+        logging.info(
+            f"Scraped {writer.records} messages from {channel_url} into {len(writer.files)} file(s) "
+            f"({mode}, {iter_kwargs})"
+        )
+    except FloodWaitError:
+        raise
+    except Exception as e:
+        logging.error(f"Error scraping {channel_url}: {e}")
+        raise
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape Telegram channels into the raw data lake.")
+    parser.add_argument("channels", nargs="*", default=DEFAULT_CHANNELS,
+                        help="Channel usernames to scrape (defaults to the medical channels list)")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore stored cursors and backfill each channel's whole history")
+    parser.add_argument("--lookback-hours", type=int, default=0,
+                        help="Re-fetch messages posted this many hours before the cursor to pick up edits")
+    parser.add_argument("--compression", choices=list(COMPRESSION_SUFFIXES), default=DEFAULT_COMPRESSION,
+                        help="Compression for the NDJSON output files")
+    parser.add_argument("--rotate-mb", type=int, default=DEFAULT_ROTATE_BYTES // (1024 * 1024),
+                        help="Start a new output file once the current one reaches this many MB")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    channels = [
-        'chemed123',
-        'lobelia4cosmetics',
-       'tikvahpharma'
-       
-    ]
-    loop = asyncio.get_event_loop()
-    for channel in channels:
-        loop.run_until_complete(scrape_channel(channel))
\ No newline at end of file
+    from src.scraping.scrape_runner import scrape_all
+
+    # Scrape all channels concurrently over one shared client
+    args = parse_args()
+    asyncio.run(scrape_all(
+        args.channels,
+        full=args.full,
+        lookback_hours=args.lookback_hours,
+        compression=args.compression,
+        rotate_bytes=args.rotate_mb * 1024 * 1024
+    ))
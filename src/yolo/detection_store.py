@@ -0,0 +1,261 @@
+# File Path: src/yolo/detection_store.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Own the detection tables and the processed-image ledger.
+# Key Features:
+# - raw.fct_image_detections, extended with channel, image_path and model_version
+# - raw.image_detection_ledger keyed by (image_path, content_hash, model_version)
+# - Model version derived from the weights file, so new weights trigger re-detection
+# - Re-detecting an image replaces its previous detections instead of duplicating them
+# - DetectionWriter buffers detections and flushes them with multi-row inserts,
+#   committing detections and ledger rows together at checkpoints so an
+#   interrupted run resumes after the last committed image
+# - Stores box coordinates (original image pixels) and image dimensions
+# - Ledger rows carry the image's perceptual hash and, for reused detections,
+#   the image they were copied from (see phash_cache.py)
+
+import os
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2.extras import execute_values
+
+# Define SQL for creating detection table
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS raw.fct_image_detections (
+    detection_id SERIAL PRIMARY KEY,
+    message_id TEXT NOT NULL,
+    detected_object_class TEXT NOT NULL,
+    confidence_score FLOAT NOT NULL,
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS channel TEXT;
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS image_path TEXT;
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS model_version TEXT;
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS box_x1 FLOAT;
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS box_y1 FLOAT;
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS box_x2 FLOAT;
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS box_y2 FLOAT;
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS image_width INTEGER;
+ALTER TABLE raw.fct_image_detections ADD COLUMN IF NOT EXISTS image_height INTEGER;
+CREATE INDEX IF NOT EXISTS idx_fct_image_detections_image_path
+    ON raw.fct_image_detections (image_path);
+"""
+
+CREATE_LEDGER_SQL = """
+CREATE TABLE IF NOT EXISTS raw.image_detection_ledger (
+    image_path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    detection_count INTEGER NOT NULL,
+    processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (image_path, content_hash, model_version)
+);
+ALTER TABLE raw.image_detection_ledger ADD COLUMN IF NOT EXISTS phash BIGINT;
+ALTER TABLE raw.image_detection_ledger ADD COLUMN IF NOT EXISTS reused_from TEXT;
+CREATE INDEX IF NOT EXISTS idx_image_detection_ledger_processed_at
+    ON raw.image_detection_ledger (processed_at);
+"""
+
+INSERT_DETECTIONS_SQL = """
+    INSERT INTO raw.fct_image_detections
+    (message_id, detected_object_class, confidence_score, channel, image_path, model_version,
+     box_x1, box_y1, box_x2, box_y2, image_width, image_height)
+    VALUES %s
+"""
+
+UPSERT_LEDGER_SQL = """
+    INSERT INTO raw.image_detection_ledger
+    (image_path, content_hash, model_version, detection_count, phash, reused_from)
+    VALUES %s
+    ON CONFLICT (image_path, content_hash, model_version) DO UPDATE SET
+        detection_count = EXCLUDED.detection_count,
+        phash = EXCLUDED.phash,
+        reused_from = EXCLUDED.reused_from,
+        processed_at = CURRENT_TIMESTAMP
+"""
+
+DEFAULT_CHECKPOINT_IMAGES = 200
+
+def ensure_tables(cur):
+    """
+    Creates or upgrades the detection table and the ledger.
+
+    Rows written before the ledger existed carry no image_path and would be
+    duplicated by the first ledgered run (which re-analyzes every image), so
+    they are dropped while the ledger is still empty.
+    """
+    cur.execute(CREATE_TABLE_SQL)
+    cur.execute(CREATE_LEDGER_SQL)
+    cur.execute("SELECT EXISTS (SELECT 1 FROM raw.image_detection_ledger);")
+    if not cur.fetchone()[0]:
+        cur.execute("DELETE FROM raw.fct_image_detections WHERE image_path IS NULL;")
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def model_version(model, weights):
+    """
+    Identifies the weights in use: '<file name>@<sha256 prefix>'.
+
+    Retraining or swapping the weights file changes the version, which
+    makes every image eligible for re-detection.
+    """
+    path = getattr(model, "ckpt_path", None) or weights
+    if path and os.path.exists(path):
+        return f"{os.path.basename(path)}@{file_sha256(path)[:16]}"
+    return os.path.basename(str(weights))
+
+def hash_images(paths, workers=8):
+    """
+    Returns {path: sha256} computed on a small thread pool (hashlib releases the
+    GIL); with workers <= 1 the files are hashed inline.
+    """
+    if workers <= 1:
+        return {path: file_sha256(path) for path in paths}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(paths, executor.map(file_sha256, paths)))
+
+def fetch_processed(cur, version, paths=None):
+    """
+    Returns {image_path: content_hash} already analyzed with this model version,
+    for the whole ledger or, when `paths` is given, only those images (an index
+    lookup on the ledger key, whatever the ledger's size).
+    """
+    if paths is None:
+        cur.execute("""
+            SELECT image_path, content_hash
+            FROM raw.image_detection_ledger
+            WHERE model_version = %s;
+        """, (version,))
+    else:
+        cur.execute("""
+            SELECT image_path, content_hash
+            FROM raw.image_detection_ledger
+            WHERE model_version = %s AND image_path = ANY(%s);
+        """, (version, list(paths)))
+    return dict(cur.fetchall())
+
+def select_pending(cur, images, version, lookup_paths=False, hash_workers=8):
+    """
+    Filters [(channel, img_file, img_path), ...] down to new or changed images.
+
+    A full scan passes every image on disk and reads the whole ledger once;
+    small batches (the stream detector) set `lookup_paths` to read only their
+    own ledger rows, and hash_workers=1 to hash their few files inline.
+
+    Returns:
+        (pending, hashes): the images to analyze and {img_path: content_hash}.
+    """
+    paths = [img_path for _, _, img_path in images]
+    processed = fetch_processed(cur, version, paths if lookup_paths else None)
+    hashes = hash_images(paths, hash_workers)
+    pending = [image for image in images if processed.get(image[2]) != hashes[image[2]]]
+    return pending, hashes
+
+def fetch_boxes(cur, img_path, version):
+    """
+    Returns (boxes, width, height) stored for an image and model version, with
+    boxes as (class_name, confidence, x1, y1, x2, y2).
+    """
+    cur.execute("""
+        SELECT detected_object_class, confidence_score, box_x1, box_y1, box_x2, box_y2,
+               image_width, image_height
+        FROM raw.fct_image_detections
+        WHERE image_path = %s AND model_version = %s;
+    """, (img_path, version))
+    rows = cur.fetchall()
+    boxes = [tuple(row[:6]) for row in rows]
+    width, height = (rows[0][6], rows[0][7]) if rows else (None, None)
+    return boxes, width, height
+
+class DetectionWriter:
+    """
+    Buffers detections and writes them in multi-row batches.
+
+    Every `checkpoint_images` images the buffer is flushed in one transaction:
+    earlier detections/ledger rows of those images are deleted, the new
+    detections and ledger rows are inserted, and the transaction is committed.
+    Because the ledger is committed together with the detections, a crashed run
+    simply resumes after the last checkpoint (see select_pending).
+
+    Usage:
+        writer = DetectionWriter(conn, version, hashes)
+        writer.add_image(image, boxes, width, height)
+        writer.close()
+    """
+
+    def __init__(self, conn, version, hashes, checkpoint_images=DEFAULT_CHECKPOINT_IMAGES, page_size=1000):
+        self.conn = conn
+        self.version = version
+        self.hashes = hashes
+        self.checkpoint_images = max(1, checkpoint_images)
+        self.page_size = page_size
+
+        self._detections = []
+        self._images = []
+        self.images_committed = 0
+        self.detections_committed = 0
+        self.checkpoints = 0
+        # Paths whose detections and ledger row are committed
+        self.committed_paths = set()
+
+    def add_image(self, image, boxes, width, height, phash=None, reused_from=None):
+        """
+        Queues one analyzed image.
+
+        Parameters:
+            image (tuple): (channel, img_file, img_path)
+            boxes (list): (class_name, confidence, x1, y1, x2, y2) in original pixels
+            width, height (int): Original image dimensions
+            phash (int): Signed 64-bit perceptual hash, if computed
+            reused_from (str): Image whose detections were copied instead of running the model
+        """
+        channel, img_file, img_path = image
+        msg_id = img_file.split('.')[0]
+        for class_name, confidence, x1, y1, x2, y2 in boxes:
+            self._detections.append((
+                msg_id, class_name, confidence, channel, img_path, self.version,
+                x1, y1, x2, y2, width, height
+            ))
+        self._images.append((img_path, self.hashes[img_path], self.version, len(boxes), phash, reused_from))
+
+        if len(self._images) >= self.checkpoint_images:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Writes and commits everything buffered so far."""
+        if not self._images:
+            return
+
+        try:
+            with self.conn.cursor() as cur:
+                paths = [row[0] for row in self._images]
+                cur.execute("DELETE FROM raw.fct_image_detections WHERE image_path = ANY(%s);", (paths,))
+                cur.execute("DELETE FROM raw.image_detection_ledger WHERE image_path = ANY(%s);", (paths,))
+                if self._detections:
+                    execute_values(cur, INSERT_DETECTIONS_SQL, self._detections, page_size=self.page_size)
+                execute_values(cur, UPSERT_LEDGER_SQL, self._images, page_size=self.page_size)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        self.checkpoints += 1
+        self.committed_paths.update(row[0] for row in self._images)
+        self.images_committed += len(self._images)
+        self.detections_committed += len(self._detections)
+        logging.info(
+            f"Checkpoint {self.checkpoints}: committed {len(self._images)} images, "
+            f"{len(self._detections)} detections ({self.images_committed} images so far)"
+        )
+        self._images = []
+        self._detections = []
+
+    def close(self):
+        self.checkpoint()
@@ -0,0 +1,156 @@
+# File Path: src/yolo/detector.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Reusable in-process YOLO detector with explicit lifecycle.
+# Key Features:
+# - load() / detect_batch() / close(): nothing happens at import time, and a
+#   loaded detector can be kept warm across calls (Dagster resource, stream
+#   detector, worker processes).
+# - Startup-time instrumentation: library import, weights preparation (ONNX
+#   export), model load and warm-up inference are timed separately.
+# - Backend-aware (see backends.py); the model version always follows the
+#   .pt weights so the ledger is backend independent.
+# - Returns plain (image, boxes, width, height) tuples with boxes in original
+#   image pixels, ready for DetectionWriter.
+
+import gc
+import time
+import logging
+
+from src.yolo.backends import prepare_weights, load_backend_model, set_cpu_threads, extract_boxes
+from src.yolo.batch_loader import (
+    PrefetchingImageLoader,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_DECODE_WORKERS,
+    DEFAULT_IMGSZ
+)
+from src.yolo.detection_store import model_version
+
+DEFAULT_WEIGHTS = "yolov8s.pt"
+
+class Detector:
+    """
+    A YOLO model that is loaded once and reused.
+
+    Usage:
+        with Detector("yolov8s.pt").load() as detector:
+            for image, boxes, width, height in detector.detect_batch(images):
+                ...
+        detector.startup   # {"import_s", "weights_s", "load_s", "warmup_s", "total_s"}
+    """
+
+    def __init__(self, weights=DEFAULT_WEIGHTS, backend="torch", imgsz=DEFAULT_IMGSZ,
+                 batch_size=DEFAULT_BATCH_SIZE, decode_workers=DEFAULT_DECODE_WORKERS, threads=None):
+        self.weights = weights
+        self.backend = backend
+        self.imgsz = imgsz
+        self.batch_size = batch_size
+        self.decode_workers = decode_workers
+        self.threads = threads
+
+        self.model = None
+        self.version = None
+        self.inference_weights = None
+        self.startup = {}
+        self.batches = 0
+        self.images = 0
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    def load(self, warmup=True):
+        """Imports the libraries, prepares and loads the weights, and runs one warm-up batch."""
+        if self.loaded:
+            return self
+
+        started = time.perf_counter()
+        import ultralytics  # noqa: F401  (timed separately: torch import dominates cold starts)
+        imported = time.perf_counter()
+
+        if self.threads:
+            set_cpu_threads(self.threads)
+        self.inference_weights = prepare_weights(self.weights, self.backend, self.imgsz)
+        prepared = time.perf_counter()
+
+        self.model = load_backend_model(self.inference_weights)
+        self.version = model_version(self.model if self.backend == "torch" else None, self.weights)
+        loaded = time.perf_counter()
+
+        if warmup:
+            import numpy as np
+            self.model([np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)], imgsz=self.imgsz, verbose=False)
+        warmed = time.perf_counter()
+
+        self.startup = {
+            "import_s": imported - started,
+            "weights_s": prepared - imported,
+            "load_s": loaded - prepared,
+            "warmup_s": warmed - loaded,
+            "total_s": warmed - started,
+        }
+        logging.info(f"Detector ready ({self.backend}, {self.version}): " + ", ".join(
+            f"{key} {value:.2f}" for key, value in self.startup.items()
+        ))
+        return self
+
+    def detect_decoded(self, batch):
+        """Runs one batch of DecodedImage through the model."""
+        predictions = self.model([image.array for image in batch], imgsz=self.imgsz, verbose=False)
+        self.batches += 1
+        self.images += len(batch)
+        return [
+            (decoded.item, extract_boxes(self.model, r, decoded.scale), decoded.original_width, decoded.original_height)
+            for decoded, r in zip(batch, predictions)
+        ]
+
+    def iter_batches(self, images, on_error=None):
+        """
+        Yields the results of each batch of [(channel, img_file, img_path), ...].
+        A failing batch is logged (and passed to `on_error(batch, exception)`)
+        and skipped, so its images stay pending.
+        """
+        if not self.loaded:
+            self.load()
+        loader = PrefetchingImageLoader(
+            [(image, image[2]) for image in images],
+            batch_size=self.batch_size,
+            workers=self.decode_workers,
+            imgsz=self.imgsz
+        )
+        for batch_no, batch in enumerate(loader, start=1):
+            try:
+                results = self.detect_decoded(batch)
+            except Exception as batch_error:
+                logging.error(f"Error analyzing batch {batch_no} of {len(batch)} images: {batch_error}")
+                if on_error is not None:
+                    on_error(batch, batch_error)
+                continue
+            yield results
+
+    def detect_batch(self, images):
+        """Returns [(image, boxes, width, height), ...] for the images that could be analyzed."""
+        return [result for batch in self.iter_batches(images) for result in batch]
+
+    def detect_path(self, img_path):
+        """Original one-image path: lets YOLO read the file itself."""
+        if not self.loaded:
+            self.load()
+        results = []
+        for r in self.model(img_path, imgsz=self.imgsz, verbose=False):
+            height, width = r.orig_shape[:2]
+            results.append((extract_boxes(self.model, r), width, height))
+        self.images += 1
+        return results
+
+    def close(self):
+        """Releases the model; a later load() starts cold again."""
+        self.model = None
+        gc.collect()
+
+    def __enter__(self):
+        return self.load()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
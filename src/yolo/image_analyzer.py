@@ -8,14 +8,46 @@
 # - Automatically creates the table if it doesn't exist
 # - Logs confidence scores and class names for analysis
 # - Added progress tracking, counters, and console output
+# - Batched inference: lists of images per model call, with the next batch
+#   decoded and resized on background threads (see batch_loader.py)
+# - Reports images per second
+# - Incremental: a ledger keyed by image path, content hash and model version
+#   (see detection_store.py) skips images already analyzed with the same
+#   weights; new weights re-detect everything automatically
+# - Detections are buffered and committed with the ledger at checkpoints
+#   (--checkpoint-every), so an interrupted run resumes where it stopped
+# - Stores box coordinates in original image pixels and the image size
+# - --workers N shards the images across N inference processes feeding one
+#   writer; --backend onnx runs an exported ONNX model (see backends.py)
+# - Reposted near-duplicate images reuse the detections of an already analyzed
+#   copy via a perceptual-hash index (see phash_cache.py)
+# - Importable: nothing runs at import time; analyze_images() takes a loaded
+#   Detector (see detector.py) so callers like Dagster can keep it warm
 
-from ultralytics import YOLO
 import os
+import time
 import logging
+import argparse
 from dotenv import load_dotenv
 import psycopg2
 from datetime import datetime
 
+from src.yolo.detection_store import (
+    ensure_tables,
+    select_pending,
+    DetectionWriter,
+    DEFAULT_CHECKPOINT_IMAGES
+)
+from src.yolo.backends import BACKENDS
+from src.yolo.detector import Detector, DEFAULT_WEIGHTS
+from src.yolo.parallel_inference import analyze_parallel
+from src.yolo.phash_cache import PhashCache, DEFAULT_PHASH_DISTANCE
+from src.yolo.batch_loader import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_DECODE_WORKERS,
+    DEFAULT_IMGSZ
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -35,32 +67,29 @@ def log_error(message):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] ERROR: {message}")
     logging.error(message)
 
-# Define SQL for creating detection table
-CREATE_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS raw.fct_image_detections (
-    detection_id SERIAL PRIMARY KEY,
-    message_id TEXT NOT NULL,
-    detected_object_class TEXT NOT NULL,
-    confidence_score FLOAT NOT NULL,
-    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-"""
-
-# Initialize YOLO model
-try:
-    log_info("⏳ Loading YOLOv8 model...")
-    model = YOLO("yolov8s.pt")  # Will auto-download if not found
-    log_info("✅ YOLOv8 model loaded successfully.")
-
-except Exception as e:
-    log_error(f"Failed to load YOLO model: {e}")
-    raise
-
 # Image directory path
-image_dir = "data/raw/images/"
+IMAGE_DIR = "data/raw/images/"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+def load_detector(weights=DEFAULT_WEIGHTS, backend="torch", imgsz=DEFAULT_IMGSZ,
+                  batch_size=DEFAULT_BATCH_SIZE, decode_workers=DEFAULT_DECODE_WORKERS):
+    """Loads the YOLOv8 model (auto-downloads the weights if not found) and reports the cold-start cost."""
+    try:
+        log_info("⏳ Loading YOLOv8 model...")
+        detector = Detector(weights, backend, imgsz, batch_size, decode_workers).load()
+        startup = detector.startup
+        log_info(
+            f"✅ YOLOv8 model loaded in {startup['total_s']:.1f}s "
+            f"(import {startup['import_s']:.1f}s, weights {startup['weights_s']:.1f}s, "
+            f"load {startup['load_s']:.1f}s, warm-up {startup['warmup_s']:.1f}s)"
+        )
+        return detector
+    except Exception as e:
+        log_error(f"Failed to load YOLO model: {e}")
+        raise
 
-# PostgreSQL connection
-try:
+def get_connection():
+    """Opens the PostgreSQL connection from environment variables."""
     log_info("🔌 Connecting to PostgreSQL database...")
     conn = psycopg2.connect(
         dbname=os.getenv("DB_NAME"),
@@ -69,65 +98,166 @@ try:
         host=os.getenv("DB_HOST"),
         port=os.getenv("DB_PORT")
     )
-    cur = conn.cursor()
     log_info("✅ Connected to PostgreSQL")
+    return conn
+
+def list_channel_images(image_dir=IMAGE_DIR):
+    """Returns [(channel, img_file, img_path), ...] for every image under image_dir/<channel>/."""
+    images = []
+    for folder in sorted(os.listdir(image_dir)):
+        channel_dir = os.path.join(image_dir, folder)
+        if os.path.isdir(channel_dir):
+            image_files = [f for f in sorted(os.listdir(channel_dir)) if f.lower().endswith(IMAGE_EXTENSIONS)]
+            log_info(f"🖼️ Found {len(image_files)} images in channel: {folder}")
+            images.extend((folder, img_file, os.path.join(channel_dir, img_file)) for img_file in image_files)
+    return images
 
-    # Create table if not exists
-    log_info("🗃️ Ensuring detection table exists...")
-    cur.execute(CREATE_TABLE_SQL)
-    conn.commit()
-    log_info("✅ Table 'raw.fct_image_detections' created or already exists.")
+def analyze_serial(detector, writer, images):
+    """Original path: one model call per image path."""
+    total_detections = 0
+    for image in images:
+        folder, img_file, img_path = image
+        log_info(f"🔍 Analyzing image: {img_file} ({folder})")
+        try:
+            for boxes, width, height in detector.detect_path(img_path):
+                writer.add_image(image, boxes, width, height)
+                found = len(boxes)
+                total_detections += found
+                log_info(f"✅ Detected {found} objects in {img_file}")
+        except Exception as img_error:
+            log_error(f"Error analyzing image {img_path}: {img_error}")
+    return total_detections
 
-    # Analyze images
-    total_images = 0
+def analyze_batched(detector, writer, images):
+    """
+    Batched path: decodes ahead on background threads and passes lists of
+    images to the model. Detection classes and confidence threshold are the
+    model defaults, exactly as in the serial path.
+    """
     total_detections = 0
+    batches = -(-len(images) // detector.batch_size)
+    for batch_no, results in enumerate(detector.iter_batches(images), start=1):
+        for image, boxes, width, height in results:
+            writer.add_image(image, boxes, width, height)
+            total_detections += len(boxes)
+        log_info(f"✅ Batch {batch_no}/{batches}: analyzed {len(results)} images")
+    return total_detections
 
-    for folder in os.listdir(image_dir):
-        channel_dir = os.path.join(image_dir, folder)
-        if os.path.isdir(channel_dir):
-            log_info(f"🖼️ Processing channel: {folder}")
-
-            image_files = [f for f in os.listdir(channel_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-            total_images += len(image_files)
-
-            for img_file in image_files:
-                img_path = os.path.join(channel_dir, img_file)
-                log_info(f"🔍 Analyzing image: {img_file} ({folder})")
-
-                try:
-                    results = model(img_path)
-
-                    for r in results:
-                        detections = r.boxes
-                        total_detections += len(detections)
-
-                        for box in detections:
-                            class_id = box.cls.item()
-                            class_name = model.names[class_id]  # Map ID to label name
-                            confidence = box.conf.item()
-                            msg_id = img_file.split('.')[0]
-
-                            cur.execute("""
-                                INSERT INTO raw.fct_image_detections 
-                                (message_id, detected_object_class, confidence_score)
-                                VALUES (%s, %s, %s)
-                            """, (msg_id, class_name, confidence))
-
-                    log_info(f"✅ Detected {len(detections)} objects in {img_file}")
-                except Exception as img_error:
-                    log_error(f"Error analyzing image {img_path}: {img_error}")
-
-    # Commit all inserts
-    conn.commit()
-    log_info(f"📊 Total images processed: {total_images}")
-    log_info(f"🎯 Total object detections recorded: {total_detections}")
-    log_info("📦 Image analysis completed and data committed to database.")
-
-except Exception as e:
-    log_error(f"Pipeline failed: {e}")
-    conn.rollback()
-    log_info("❌ Transaction rolled back due to error.")
-finally:
-    cur.close()
-    conn.close()
-    log_info("🔌 Connection to PostgreSQL closed.")
\ No newline at end of file
+def analyze_images(detector, conn, image_dir=IMAGE_DIR, reprocess=False,
+                   checkpoint_every=DEFAULT_CHECKPOINT_IMAGES, workers=1, threads=None,
+                   phash_distance=DEFAULT_PHASH_DISTANCE, use_phash_cache=True):
+    """
+    Analyzes every new or changed image under image_dir with a loaded detector.
+
+    Detections are committed at checkpoints; on failure the uncommitted rest
+    is rolled back and the exception propagates. Returns a summary dict.
+    """
+    version = detector.version
+    log_info(f"🏷️ Model version: {version}")
+    writer = None
+
+    try:
+        with conn.cursor() as cur:
+            # Create table if not exists
+            log_info("🗃️ Ensuring detection table exists...")
+            ensure_tables(cur)
+            conn.commit()
+            log_info("✅ Tables 'raw.fct_image_detections' and 'raw.image_detection_ledger' ready.")
+
+            # Only analyze new or changed images (or everything after a weights change)
+            all_images = list_channel_images(image_dir)
+            images, hashes = select_pending(cur, all_images, "" if reprocess else version)
+            log_info(f"🧾 {len(images)} of {len(all_images)} images need analysis with {version}")
+
+            writer = DetectionWriter(conn, version, hashes, checkpoint_images=checkpoint_every)
+            start = time.perf_counter()
+
+            # Near-duplicates of analyzed images copy their detections instead of running the model
+            cache = None
+            to_analyze, target = images, writer
+            if use_phash_cache and not reprocess:
+                cache = PhashCache(cur, version, phash_distance)
+                to_analyze = cache.partition(images, writer)
+                target = cache.wrap(writer)
+                log_info(f"🧬 {len(images) - len(to_analyze)} near-duplicate images will reuse cached detections")
+
+            inference_start = time.perf_counter()
+            if workers > 1:
+                total_detections = analyze_parallel(target, to_analyze, detector.inference_weights, workers,
+                                                    threads, detector.batch_size, detector.imgsz,
+                                                    backend=detector.backend)
+            elif detector.batch_size > 1:
+                total_detections = analyze_batched(detector, target, to_analyze)
+            else:
+                total_detections = analyze_serial(detector, target, to_analyze)
+            inference_elapsed = time.perf_counter() - inference_start
+
+            if cache is not None:
+                cache.resolve_followers(writer)
+                log_info(f"🧬 {cache.summary(inference_elapsed / max(len(to_analyze), 1))}")
+
+            # Commit the last partial checkpoint
+            writer.close()
+            elapsed = max(time.perf_counter() - start, 1e-9)
+    except Exception:
+        conn.rollback()
+        committed = writer.images_committed if writer is not None else 0
+        log_info(f"❌ Uncommitted work rolled back; {committed} images were checkpointed and will be skipped on the next run.")
+        raise
+
+    log_info(f"📊 Total images processed: {len(images)} ({writer.checkpoints} checkpoints)")
+    log_info(f"🎯 Total object detections recorded: {writer.detections_committed} ({total_detections} from the model)")
+    log_info(f"⚡ Throughput: {len(images) / elapsed:.1f} images/s over {elapsed:.1f}s "
+             f"(batch size {detector.batch_size}, {workers} worker(s), {detector.backend})")
+    return {
+        "images": len(images),
+        "detections": writer.detections_committed,
+        "seconds": elapsed,
+        "startup": detector.startup,
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run YOLOv8 object detection on downloaded images.")
+    parser.add_argument("--image-dir", default=IMAGE_DIR, help="Root folder with one sub-folder per channel")
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS, help="YOLO weights file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Images per model call; 1 runs the original one-image-at-a-time loop")
+    parser.add_argument("--decode-workers", type=int, default=DEFAULT_DECODE_WORKERS,
+                        help="Background threads decoding and resizing the next batch")
+    parser.add_argument("--imgsz", type=int, default=DEFAULT_IMGSZ, help="Model input size")
+    parser.add_argument("--reprocess", action="store_true",
+                        help="Ignore the ledger and analyze every image again")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_IMAGES,
+                        help="Commit detections and the ledger every N images")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Inference processes; each loads the model once (CPU-only workers)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Torch threads per inference process (default: cores / workers)")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch",
+                        help="torch runs the .pt weights; onnx exports them once and uses ONNX Runtime")
+    parser.add_argument("--phash-distance", type=int, default=DEFAULT_PHASH_DISTANCE,
+                        help="Max Hamming distance (of 64 bits) for an image to reuse a near-duplicate's detections")
+    parser.add_argument("--no-phash-cache", action="store_true",
+                        help="Run the model on every pending image, even near-duplicates")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    detector = load_detector(args.weights, args.backend, args.imgsz, args.batch_size, args.decode_workers)
+    conn = None
+
+    try:
+        conn = get_connection()
+        analyze_images(detector, conn, args.image_dir, args.reprocess, args.checkpoint_every,
+                       args.workers, args.threads, args.phash_distance, not args.no_phash_cache)
+        log_info("📦 Image analysis completed and data committed to database.")
+    except Exception as e:
+        log_error(f"Pipeline failed: {e}")
+    finally:
+        detector.close()
+        if conn is not None:
+            conn.close()
+        log_info("🔌 Connection to PostgreSQL closed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# File Path: src/yolo/parallel_inference.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Run YOLO inference on several CPU processes at once.
+# Key Features:
+# - Shards the per-channel image lists across N worker processes, keeping a
+#   channel's images together where the shard sizes allow it.
+# - Each worker loads the model once and caps its torch threads at
+#   cores / workers to avoid oversubscription.
+# - Workers only run inference; all results flow back to a single writer in
+#   the main process (see DetectionWriter).
+# - Works with every backend in backends.py; each worker runs a Detector
+#   (see detector.py) and reports its cold-start time.
+
+import os
+import queue
+import logging
+import multiprocessing as mp
+
+from src.yolo.detector import Detector
+from src.yolo.batch_loader import DEFAULT_BATCH_SIZE, DEFAULT_IMGSZ
+
+DEFAULT_INFERENCE_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+# Decoder threads per worker; the cores belong to inference
+WORKER_DECODE_THREADS = 1
+# How often the main process checks that workers are still alive
+POLL_SECONDS = 5
+
+def shard_images(images, shards):
+    """
+    Splits [(channel, img_file, img_path), ...] into `shards` lists of similar size.
+
+    Channels larger than an even share are cut into pieces first; pieces are
+    then handed to the smallest shard, largest first.
+    """
+    by_channel = {}
+    for image in images:
+        by_channel.setdefault(image[0], []).append(image)
+
+    target = max(1, -(-len(images) // max(1, shards)))
+    pieces = []
+    for channel_images in by_channel.values():
+        for start in range(0, len(channel_images), target):
+            pieces.append(channel_images[start:start + target])
+
+    buckets = [[] for _ in range(max(1, shards))]
+    for piece in sorted(pieces, key=len, reverse=True):
+        min(buckets, key=len).extend(piece)
+    return buckets
+
+def inference_worker(worker_id, shard, results, weights, backend, threads, batch_size, imgsz):
+    """
+    Worker process: analyzes one shard and puts messages on `results`:
+
+        ("loaded", worker_id, seconds to load the model)
+        ("batch", worker_id, [(image, boxes, width, height), ...])
+        ("error", worker_id, message)
+        ("exit", worker_id, None)
+    """
+    try:
+        detector = Detector(weights, backend, imgsz, batch_size, WORKER_DECODE_THREADS, threads)
+        detector.load(warmup=False)
+        results.put(("loaded", worker_id, detector.startup["total_s"]))
+
+        def report(batch, batch_error):
+            results.put(("error", worker_id, f"batch of {len(batch)} images failed: {batch_error}"))
+
+        for batch in detector.iter_batches(shard, on_error=report):
+            results.put(("batch", worker_id, batch))
+        detector.close()
+    except Exception as e:
+        results.put(("error", worker_id, str(e)))
+    finally:
+        results.put(("exit", worker_id, None))
+
+def analyze_parallel(writer, images, weights, workers=DEFAULT_INFERENCE_WORKERS, threads=None,
+                     batch_size=DEFAULT_BATCH_SIZE, imgsz=DEFAULT_IMGSZ, stats=None, backend="torch"):
+    """
+    Analyzes `images` on `workers` processes and feeds every result to
+    `writer.add_image`. Returns the number of detections.
+
+    `threads` defaults to cores / workers. If `stats` is a dict it receives
+    the per-worker model load times and the number of errors.
+    """
+    shards = [shard for shard in shard_images(images, workers) if shard]
+    if not shards:
+        return 0
+    threads = threads or max(1, (os.cpu_count() or 1) // len(shards))
+
+    # spawn: forking a parent that already initialised torch can deadlock
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue(maxsize=len(shards) * 4)
+    processes = [
+        ctx.Process(target=inference_worker,
+                    args=(worker_id, shard, results, weights, backend, threads, batch_size, imgsz),
+                    daemon=True)
+        for worker_id, shard in enumerate(shards)
+    ]
+    for process in processes:
+        process.start()
+    logging.info(f"Analyzing {len(images)} images on {len(shards)} process(es), {threads} torch thread(s) each")
+
+    load_seconds, errors, exited = [], 0, 0
+    total_detections = 0
+    analyzed = 0
+    while exited < len(processes):
+        try:
+            kind, worker_id, payload = results.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                logging.error("Inference workers exited without reporting back")
+                errors += 1
+                break
+            continue
+
+        if kind == "loaded":
+            load_seconds.append(payload)
+            logging.info(f"Worker {worker_id} loaded {weights} in {payload:.1f}s")
+        elif kind == "batch":
+            for image, boxes, width, height in payload:
+                writer.add_image(image, boxes, width, height)
+                total_detections += len(boxes)
+            analyzed += len(payload)
+            logging.info(f"Worker {worker_id}: {analyzed}/{len(images)} images analyzed")
+        elif kind == "error":
+            errors += 1
+            logging.error(f"Worker {worker_id}: {payload}")
+        elif kind == "exit":
+            exited += 1
+
+    for process in processes:
+        process.join()
+
+    if stats is not None:
+        stats["load_seconds"] = load_seconds
+        stats["errors"] = errors
+    return total_detections
@@ -0,0 +1,220 @@
+# File Path: src/yolo/phash_cache.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Reuse detections for reposted (near-duplicate) images.
+# Key Features:
+# - 64-bit difference hash (dHash) per image: survives recompression and resizing.
+# - BK-tree over the hashes of analyzed images for Hamming-distance lookups.
+# - Images within the distance threshold copy the detections of their match
+#   (boxes rescaled to their own size) instead of running the model.
+# - Near-duplicates inside one run are analyzed once: the first copy goes to
+#   the model, the others wait for its result.
+# - Hit-rate and time-saved counters.
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from src.yolo.detection_store import fetch_boxes
+
+DEFAULT_PHASH_DISTANCE = 4
+HASH_SIZE = 8
+
+def dhash(path, hash_size=HASH_SIZE):
+    """
+    Returns the difference hash of an image as an unsigned int, or None if it
+    cannot be decoded. Each bit says whether a pixel of the grayscale
+    (hash_size + 1) x hash_size thumbnail is brighter than its right neighbour.
+    """
+    gray = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray is None:
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+
+    thumb = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    value = 0
+    for bit in (thumb[:, 1:] > thumb[:, :-1]).flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+def to_signed(value):
+    """Maps an unsigned 64-bit hash to the BIGINT range."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+class BKTree:
+    """Burkhard-Keller tree for nearest-neighbour search under Hamming distance."""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, key):
+        self.size += 1
+        if self.root is None:
+            self.root = (value, key, {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, key, {})
+                return
+            node = child
+
+    def find(self, value, max_distance):
+        """Returns (distance, key) of the closest entry within max_distance, or None."""
+        best = None
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance and (best is None or distance < best[0]):
+                best = (distance, node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return best
+
+def scale_boxes(boxes, from_size, to_size):
+    """Rescales (class_name, confidence, x1, y1, x2, y2) boxes between image sizes."""
+    (from_w, from_h), (to_w, to_h) = from_size, to_size
+    if not from_w or not from_h or not to_w or not to_h:
+        return list(boxes)
+    sx, sy = to_w / from_w, to_h / from_h
+    return [(name, conf, x1 * sx, y1 * sy, x2 * sx, y2 * sy) for name, conf, x1, y1, x2, y2 in boxes]
+
+def image_size(path):
+    image = cv2.imread(path)
+    if image is None:
+        return None, None
+    height, width = image.shape[:2]
+    return width, height
+
+class PhashCache:
+    """
+    Perceptual-hash index of analyzed images.
+
+    Usage:
+        cache = PhashCache(cur, version, max_distance=4)
+        to_analyze = cache.partition(images, writer)   # reused images go straight to the writer
+        analyze(..., cache.wrap(writer), to_analyze)     # remembers results of analyzed images
+        cache.resolve_followers(writer)                  # near-duplicates within this run
+        cache.summary(seconds_per_image)
+    """
+
+    def __init__(self, cur, version, max_distance=DEFAULT_PHASH_DISTANCE, workers=8):
+        self.cur = cur
+        self.version = version
+        self.max_distance = max_distance
+        self.workers = workers
+
+        self.tree = BKTree()
+        self.phashes = {}      # img_path -> signed hash of every pending image
+        self.results = {}      # img_path -> (boxes, width, height) analyzed in this run
+        self.followers = {}    # leader img_path -> [(image, distance), ...]
+
+        self.lookups = 0
+        self.hits = 0
+        self.reused = 0
+
+    def _load(self, pending_paths):
+        """Indexes images analyzed by earlier runs, except the ones being redone now."""
+        self.cur.execute("""
+            SELECT image_path, phash
+            FROM raw.image_detection_ledger
+            WHERE model_version = %s AND phash IS NOT NULL AND reused_from IS NULL;
+        """, (self.version,))
+        for img_path, phash in self.cur.fetchall():
+            if img_path not in pending_paths:
+                self.tree.add(to_unsigned(phash), img_path)
+        logging.info(f"Perceptual-hash index loaded with {self.tree.size} analyzed images")
+
+    def partition(self, images, writer):
+        """
+        Splits pending images into the ones the model must see and the rest.
+
+        Matches of previously analyzed images are written to `writer` right away;
+        matches of images earlier in this run are queued as followers.
+        """
+        paths = [img_path for _, _, img_path in images]
+        self._load(set(paths))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            hashes = list(executor.map(dhash, paths))
+
+        to_analyze = []
+        for image, value in zip(images, hashes):
+            img_path = image[2]
+            if value is None:
+                to_analyze.append(image)
+                continue
+            self.phashes[img_path] = to_signed(value)
+            self.lookups += 1
+
+            match = self.tree.find(value, self.max_distance)
+            if match is None:
+                self.tree.add(value, img_path)
+                to_analyze.append(image)
+                continue
+
+            distance, source = match
+            self.hits += 1
+            if source in self.phashes and source not in self.results:
+                # Source is pending in this run: wait for its detections
+                self.followers.setdefault(source, []).append((image, distance))
+                continue
+
+            boxes, width, height = fetch_boxes(self.cur, source, self.version)
+            self._reuse(writer, image, source, boxes, (width, height))
+        return to_analyze
+
+    def _reuse(self, writer, image, source, boxes, source_size):
+        img_path = image[2]
+        size = image_size(img_path)
+        if None in size:
+            size = source_size
+        writer.add_image(image, scale_boxes(boxes, source_size, size), size[0], size[1],
+                         phash=self.phashes.get(img_path), reused_from=source)
+        self.reused += 1
+
+    def wrap(self, writer):
+        """Returns a writer that also remembers each analyzed image's detections."""
+        return _RememberingWriter(self, writer)
+
+    def resolve_followers(self, writer):
+        """Writes near-duplicates whose source was analyzed in this run."""
+        for source, followers in self.followers.items():
+            if source not in self.results:
+                # The source failed; its followers stay pending for the next run
+                continue
+            boxes, width, height = self.results[source]
+            for image, _ in followers:
+                self._reuse(writer, image, source, boxes, (width, height))
+        self.followers = {}
+
+    def summary(self, seconds_per_image):
+        hit_rate = self.hits / self.lookups if self.lookups else 0.0
+        saved = self.reused * seconds_per_image
+        message = (f"Perceptual-hash cache: {self.hits}/{self.lookups} hits ({hit_rate:.1%}), "
+                   f"{self.reused} images reused, ~{saved:.1f}s of inference saved "
+                   f"(distance <= {self.max_distance})")
+        logging.info(message)
+        return message
+
+class _RememberingWriter:
+    def __init__(self, cache, writer):
+        self.cache = cache
+        self.writer = writer
+
+    def add_image(self, image, boxes, width, height):
+        img_path = image[2]
+        self.cache.results[img_path] = (boxes, width, height)
+        self.writer.add_image(image, boxes, width, height, phash=self.cache.phashes.get(img_path))
@@ -0,0 +1,172 @@
+# File Path: src/yolo/stream_detector.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Long-running YOLO detector fed by the image downloader's spool.
+# Key Features:
+# - Consumes data/state/detection_spool (filled by the downloader with
+#   --stream-detection) instead of listing data/raw/images/ after a full run.
+# - Micro-batching: a batch is run as soon as it is full or its oldest image
+#   has waited --max-wait seconds, so new posts are enriched within seconds.
+# - Keeps one Detector (see detector.py) warm between batches.
+# - Each batch reads only its own ledger rows and hashes its few files inline,
+#   so the per-batch cost does not grow with the ledger.
+# - Commits each micro-batch with the ledger, then acknowledges only the spool
+#   entries whose detections were committed (or were already in the ledger);
+#   images that failed to decode or whose batch failed are re-queued. A crash
+#   re-delivers unacknowledged images and the ledger skips any already committed.
+# - Logs download-to-commit latency per batch.
+
+import os
+import time
+import signal
+import argparse
+
+from src.scraping.image_spool import ImageSpool, SPOOL_DIR
+from src.yolo.image_analyzer import (
+    log_info,
+    log_error,
+    load_detector,
+    get_connection,
+    analyze_batched
+)
+from src.yolo.detector import DEFAULT_WEIGHTS
+from src.yolo.detection_store import ensure_tables, select_pending, DetectionWriter
+from src.yolo.batch_loader import DEFAULT_BATCH_SIZE, DEFAULT_DECODE_WORKERS, DEFAULT_IMGSZ
+
+DEFAULT_MAX_WAIT = 2.0
+DEFAULT_POLL_INTERVAL = 0.5
+# Pause before retrying a batch after a database or model error
+RETRY_DELAY = 10
+
+class StreamDetector:
+    """
+    Runs micro-batches of spooled images through a warm Detector.
+
+    Usage:
+        stream = StreamDetector(detector, conn, ImageSpool())
+        stream.run()          # until stop() or SIGTERM
+        stream.run(once=True) # drain the spool and return
+    """
+
+    def __init__(self, detector, conn, spool, max_wait=DEFAULT_MAX_WAIT, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.detector = detector
+        self.conn = conn
+        self.version = detector.version
+        self.spool = spool
+        self.batch_size = max(1, detector.batch_size)
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+
+        self.batches = 0
+        self.images = 0
+        self.detections = 0
+        self._stopping = False
+
+    def stop(self, *_):
+        self._stopping = True
+
+    def run(self, once=False):
+        log_info(f"👀 Watching {self.spool.spool_dir} ({len(self.spool)} images waiting)")
+        while not self._stopping:
+            entries = self.spool.pending(limit=self.batch_size)
+            if not entries:
+                if once:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            # Wait for a fuller batch unless the oldest image has waited long enough
+            waited = time.time() - entries[0].saved_at
+            if len(entries) < self.batch_size and waited < self.max_wait and not once:
+                time.sleep(min(self.poll_interval, self.max_wait - waited))
+                continue
+
+            try:
+                if not self.process(entries) and not once:
+                    # Nothing could be analyzed (e.g. files still being written)
+                    time.sleep(RETRY_DELAY)
+            except Exception as e:
+                self.conn.rollback()
+                log_error(f"Micro-batch of {len(entries)} images failed, retrying in {RETRY_DELAY}s: {e}")
+                if once:
+                    raise
+                time.sleep(RETRY_DELAY)
+
+        log_info(f"🛑 Stream detector stopped: {self.images} images, {self.detections} detections "
+                 f"in {self.batches} micro-batches")
+
+    def process(self, entries):
+        """Detects, commits and acknowledges one micro-batch. Returns the number of entries acknowledged."""
+        images = [
+            (entry.channel, os.path.basename(entry.image_path), entry.image_path)
+            for entry in entries if os.path.exists(entry.image_path)
+        ]
+        with self.conn.cursor() as cur:
+            # Only this batch's ledger rows, so the cost does not grow with history
+            pending, hashes = select_pending(cur, images, self.version, lookup_paths=True, hash_workers=1)
+
+        writer = DetectionWriter(self.conn, self.version, hashes, checkpoint_images=len(pending) + 1)
+        found = analyze_batched(self.detector, writer, pending)
+        writer.close()
+        self.conn.commit()
+
+        # Done: committed now, or already in the ledger with the same content.
+        # Missing files, undecodable images and failed batches stay queued.
+        pending_paths = {img_path for _, _, img_path in pending}
+        settled = writer.committed_paths | ({img_path for _, _, img_path in images} - pending_paths)
+        done = [entry for entry in entries if entry.image_path in settled]
+        failed = [entry for entry in entries if entry.image_path not in settled]
+        self.spool.ack(done)
+        if failed:
+            log_error(f"{len(failed)} image(s) of micro-batch {self.batches + 1} were not analyzed; re-queued")
+            self.spool.defer(failed)
+
+        now = time.time()
+        latencies = [now - entry.saved_at for entry in entries]
+        self.batches += 1
+        self.images += len(writer.committed_paths)
+        self.detections += found
+        log_info(
+            f"⚡ Micro-batch {self.batches}: {len(writer.committed_paths)} of {len(entries)} images analyzed, "
+            f"{found} detections, latency avg {sum(latencies) / len(latencies):.1f}s / max {max(latencies):.1f}s"
+        )
+        return len(done)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Continuously detect objects in newly downloaded images.")
+    parser.add_argument("--spool-dir", default=SPOOL_DIR, help="Spool directory filled by the downloader")
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS, help="YOLO weights file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Maximum images per micro-batch")
+    parser.add_argument("--max-wait", type=float, default=DEFAULT_MAX_WAIT,
+                        help="Seconds an image may wait for its micro-batch to fill up")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between spool checks")
+    parser.add_argument("--decode-workers", type=int, default=DEFAULT_DECODE_WORKERS,
+                        help="Background threads decoding and resizing images")
+    parser.add_argument("--imgsz", type=int, default=DEFAULT_IMGSZ, help="Model input size")
+    parser.add_argument("--once", action="store_true", help="Drain the spool and exit")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    detector = load_detector(args.weights, imgsz=args.imgsz, batch_size=args.batch_size,
+                             decode_workers=args.decode_workers)
+    log_info(f"🏷️ Model version: {detector.version}")
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            ensure_tables(cur)
+        conn.commit()
+
+        stream = StreamDetector(detector, conn, ImageSpool(args.spool_dir), args.max_wait, args.poll_interval)
+        signal.signal(signal.SIGTERM, stream.stop)
+        signal.signal(signal.SIGINT, stream.stop)
+        stream.run(once=args.once)
+    finally:
+        detector.close()
+        conn.close()
+        log_info("🔌 Connection to PostgreSQL closed.")
+
+if __name__ == "__main__":
+    main()
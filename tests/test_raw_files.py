@@ -0,0 +1,36 @@
+# File Path: tests/test_raw_files.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Partial-load bookkeeping for raw NDJSON files.
+# Key Features:
+# - Malformed NDJSON lines are counted, not silently dropped.
+# - The load ledger never treats a partial load as complete.
+
+import os
+
+import pytest
+
+from src.scraping.raw_files import iter_raw_records
+
+def test_malformed_lines_are_counted(tmp_path):
+    path = tmp_path / "chan.000000.001.ndjson"
+    path.write_text('{"id": 1}\n{"id": 2\n{"id": 3}\n', encoding="utf-8")
+
+    stats = {"skipped_lines": 0}
+    records = list(iter_raw_records(str(path), stats))
+
+    assert [msg["id"] for msg, _ in records] == [1, 3]
+    assert stats["skipped_lines"] == 1
+
+def test_partial_load_is_reloaded_even_if_unchanged(tmp_path):
+    pytest.importorskip("psycopg2")
+    pytest.importorskip("dotenv")
+    from src.scraping.load_data import check_ledger, file_checksum
+
+    path = tmp_path / "chan.000000.001.ndjson"
+    path.write_text('{"id": 1}\n', encoding="utf-8")
+    stat = os.stat(path)
+    entry = (stat.st_size, stat.st_mtime, file_checksum(str(path)))
+
+    assert check_ledger({str(path): entry + (0,)}, str(path))[0] is False
+    assert check_ledger({str(path): entry + (1,)}, str(path))[0] is True
@@ -0,0 +1,103 @@
+# File Path: tests/test_stream_detector.py
+# Date: 17 October 2026
+# Developed by: Addisu Taye Dadi
+# Purpose: Spool acknowledgement rules of the streaming detector.
+# Key Features:
+# - Runs StreamDetector.process with the real Detector batching, spool and
+#   DetectionWriter; only the model, the decoder and the database are faked.
+# - An image that cannot be decoded must stay in the spool.
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("psycopg2")
+pytest.importorskip("dotenv")
+
+from src.scraping.image_spool import ImageSpool
+from src.yolo import batch_loader, detection_store, detector as detector_module
+from src.yolo.batch_loader import DecodedImage
+from src.yolo.detector import Detector
+from src.yolo.stream_detector import StreamDetector
+
+class FakeCursor:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+
+    def fetchall(self):
+        return []
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self.queries)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+@pytest.fixture
+def stream(tmp_path, monkeypatch):
+    def decode(item, path, imgsz=batch_loader.DEFAULT_IMGSZ):
+        if path.endswith("broken.jpg"):
+            return None
+        return DecodedImage(item, object(), 640, 480, 1.0)
+
+    monkeypatch.setattr(batch_loader, "decode_image", decode)
+    monkeypatch.setattr(detector_module, "extract_boxes", lambda model, r, scale=1.0: [("bottle", 0.9, 1, 2, 3, 4)])
+    monkeypatch.setattr(detection_store, "execute_values", lambda *args, **kwargs: None)
+
+    detector = Detector(batch_size=4, decode_workers=1)
+    detector.model = lambda arrays, **kwargs: [object() for _ in arrays]
+    detector.version = "test"
+
+    spool = ImageSpool(str(tmp_path / "spool"))
+    channel_dir = tmp_path / "images" / "chan"
+    channel_dir.mkdir(parents=True)
+    for name in ("1.jpg", "broken.jpg"):
+        (channel_dir / name).write_bytes(b"image " + name.encode())
+        spool.push("chan", name.split(".")[0], str(channel_dir / name))
+
+    return StreamDetector(detector, FakeConnection(), spool), channel_dir
+
+def test_undecodable_image_stays_in_spool(stream):
+    stream_detector, channel_dir = stream
+
+    acknowledged = stream_detector.process(stream_detector.spool.pending())
+
+    assert acknowledged == 1
+    remaining = stream_detector.spool.pending()
+    assert [entry.image_path for entry in remaining] == [str(channel_dir / "broken.jpg")]
+    assert remaining[0].attempts == 1
+
+def test_entry_moves_to_failed_after_max_attempts(stream):
+    stream_detector, channel_dir = stream
+
+    for _ in range(5):
+        stream_detector.process(stream_detector.spool.pending())
+
+    assert stream_detector.spool.pending() == []
+    failed = ImageSpool(f"{stream_detector.spool.spool_dir}/failed").pending()
+    assert [entry.image_path for entry in failed] == [str(channel_dir / "broken.jpg")]
+
+def test_ledger_lookup_is_limited_to_the_batch(stream):
+    stream_detector, channel_dir = stream
+
+    stream_detector.process(stream_detector.spool.pending())
+
+    lookups = [params for query, params in stream_detector.conn.queries if "image_detection_ledger" in query
+               and query.lstrip().startswith("SELECT")]
+    assert lookups == [("test", [str(channel_dir / "1.jpg"), str(channel_dir / "broken.jpg")])]